@@ -5,7 +5,13 @@ This module defines the main application factory for creating and configuring th
 It initializes the database and registers the API routes.
 
 Functions:
-    - `create_app()`: Creates and configures the Flask app instance.
+    - `create_app(config)`: Creates and configures the Flask app instance.
+
+Configuration:
+    Defaults are set in `create_app`. Any key can be overridden with an environment
+    variable prefixed with `CONTENT_` (values are parsed as JSON, e.g.
+    `CONTENT_TRACING_ENABLED=true`), then by the `config` mapping passed to
+    `create_app` (e.g. `create_app({"TRACING_EXPORTER": "memory"})` in tests).
 
 Execution:
     If this script is run as the main module, it starts the Flask development server.
@@ -13,30 +19,121 @@ Execution:
 Components:
     - MongoDB: Configured as the application's database with URI `mongodb://mongodb:27017/contentdb`.
     - Routes: Registers all routes defined in the `routes` module.
+    - Load shedding: Rejects requests with `503` when the process or the MongoDB pool is saturated.
+    - Rate limiting: Per-client token buckets per route class, rejecting with `429`.
+    - Tracing: A span per request and per MongoDB command, exported to a file or kept in memory.
+    - Review queue: Optional write-behind batching of posted reviews.
+    - Localization: `Accept-Language` driven reads and a per-locale cache of the top rated films.
+    - Startup: Import and initialization phases are timed (see `GET /health/ready` and `GET /metrics`),
+      and the MongoDB pool is warmed up in the background before the readiness probe passes.
+      Tracing, the review queue and the locale cache are only imported when their flag is on.
 """
 
-from flask import Flask
-from services.db import init_db
-from routes import init_routes  # Import routes to avoid circular dependencies
-from flask_cors import CORS
+from services.startup import startup, start_mongo_warmup
+
+with startup.phase("import.dependencies"):
+    from flask import Flask
+    from flask_cors import CORS
 
-def create_app():
+with startup.phase("import.services"):
+    from services.db import DEFAULT_URI, init_db, mongo
+    from services.extensions import invalidate_reviewed_films
+    from services.load_shedding import init_load_shedding, pool_monitor
+    from services.rate_limit import DEFAULT_LIMITS, init_rate_limit
+    from routes import init_routes  # Import routes to avoid circular dependencies
+
+def create_app(config=None):
     """
     Create and configure the Flask application.
 
+    Args:
+        config (dict, optional): Configuration overriding the defaults and the environment.
+
     Returns:
         Flask: Configured Flask application instance.
     """
     app = Flask(__name__)
 
     # Application configuration
-    app.config["MONGO_URI"] = "mongodb://content_mongodb:27017/contentdb"
+    app.config["MONGO_URI"] = DEFAULT_URI
+    app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # bodies larger than a MongoDB document get 413
+
+    # Protection against abusive clients and overload
+    # Off by default: behind a gateway, set RATE_LIMIT_TRUSTED_PROXIES first or every user shares its bucket
+    app.config["RATE_LIMIT_ENABLED"] = False
+    app.config["RATE_LIMIT_BACKEND"] = "memory"  # "mongo" to share buckets between replicas
+    app.config["RATE_LIMITS"] = dict(DEFAULT_LIMITS)  # class -> (bucket capacity, tokens refilled per second)
+    app.config["RATE_LIMIT_TRUSTED_PROXIES"] = 0  # proxies appending to X-Forwarded-For
+    app.config["LOAD_SHED_ENABLED"] = True
+    app.config["LOAD_SHED_MAX_IN_FLIGHT"] = 64
+    app.config["LOAD_SHED_MAX_POOL_WAIT_MS"] = 250.0
+
+    # Tracing, W3C trace-context propagation and OTLP/JSON span export
+    app.config["TRACING_ENABLED"] = False
+    app.config["TRACING_EXPORTER"] = "file"  # "memory" to collect spans in tests
+    app.config["TRACING_FILE"] = "traces.ndjson"
+    app.config["TRACING_SERVICE_NAME"] = "content_service"
+    app.config["TRACING_SAMPLE_RATIO"] = 1.0
+
+    # Queue reviews in memory and write them in batches (see services/review_queue.py for durability)
+    app.config["REVIEW_WRITE_BEHIND"] = False
+    app.config["REVIEW_QUEUE_SIZE"] = 10000
+    app.config["REVIEW_BATCH_SIZE"] = 500
+    app.config["REVIEW_FLUSH_INTERVAL"] = 0.5  # seconds
+    app.config["REVIEW_MAX_BYTES"] = 10000  # larger review bodies are rejected with 413
+
+    # Localized catalog reads: films may carry "titles"/"descriptions" maps by locale
+    app.config["SUPPORTED_LOCALES"] = ["en", "it"]
+    app.config["DEFAULT_LOCALE"] = "en"  # locale of the untranslated title and description
+    app.config["LOCALE_CACHE_ENABLED"] = True
+    app.config["LOCALE_CACHE_SIZE"] = 100  # top rated films kept per locale
+    app.config["LOCALE_CACHE_TTL"] = 60  # seconds between refreshes
+    app.config["LOCALE_CACHE_READ_PREFERENCE"] = "nearest"  # or "primary", "secondary_preferred", ...
+
+    # Connections opened before the readiness probe passes
+    app.config["MONGO_WARMUP_ENABLED"] = True
+    app.config["MONGO_WARMUP_CONNECTIONS"] = 4
+
+    # Overrides: CONTENT_* environment variables, then the `config` argument
+    app.config.from_prefixed_env("CONTENT")
+    app.config.update(config or {})
 
     CORS(app)
 
-    # Initialize database and routes
-    init_db(app)
-    init_routes(app)
+    # Optional subsystems are imported only when enabled; routes find them in `app.extensions`.
+    # Tracing first so that shed and rate limited requests are traced too
+    event_listeners = [pool_monitor]
+    if app.config["TRACING_ENABLED"]:
+        with startup.phase("init.tracing"):
+            from services.tracing import init_tracing, mongo_listener
+            init_tracing(app)
+            event_listeners.append(mongo_listener)
+
+    # Right after tracing, load shedding runs before rate limiting and the routes so that
+    # saturated processes reject work as cheaply as possible
+    with startup.phase("init.protection"):
+        init_load_shedding(app)
+        init_rate_limit(app)
+
+    # Initialize database and routes. The warm-up opens the pool in background.
+    with startup.phase("init.db"):
+        init_db(app, event_listeners=event_listeners)
+    with startup.phase("init.routes"):
+        init_routes(app)
+    if app.config["REVIEW_WRITE_BEHIND"]:
+        with startup.phase("init.review_queue"):
+            from services.review_queue import init_review_queue
+            init_review_queue(app, on_flush=lambda film_ids: invalidate_reviewed_films(app, film_ids))
+    if app.config["LOCALE_CACHE_ENABLED"]:
+        with startup.phase("init.locale_cache"):
+            from services.locale_cache import init_locale_cache
+            init_locale_cache(app)
+
+    if app.config["MONGO_WARMUP_ENABLED"]:
+        start_mongo_warmup(app, mongo.cx)
+    else:
+        startup.ready.set()
+    startup.finish(app)
 
     # Optional: Print all registered routes for debugging
     #print("Registered Routes:")
@@ -8,9 +8,13 @@ class Film:
         release_year (int): Year the film was released.
         genre (str): Genre of the film (e.g., 'Drama', 'Action').
         rating (float): Rating of the film (e.g., IMDb or other rating systems).
+        schema_version (int): Storage layout of the film document (see services/film_store.py).
+        titles (dict): Localized titles by locale (e.g. {"it": "..."}).
+        descriptions (dict): Localized descriptions by locale.
     """
 
-    def __init__(self, title, actors, release_year, genre, rating, description, image_path,trailer_path ,reviews=None):
+    def __init__(self, title, actors, release_year, genre, rating, description, image_path,trailer_path ,reviews=None, schema_version=2,
+                 titles=None, descriptions=None):
         """
         Initializes a Film object.
 
@@ -23,6 +27,9 @@ class Film:
             description (str): The film's description.
             reviews (list, optional): List of review ObjectIds related to this film.
             image_path (str): The main image of the film.
+            schema_version (int, optional): Storage layout version, 1 for documents not yet migrated.
+            titles (dict, optional): Localized titles by locale.
+            descriptions (dict, optional): Localized descriptions by locale.
         """
         self.title = title  # Title of the film
         self.actors = actors  # List or string of actor IDs
@@ -33,6 +40,9 @@ class Film:
         self.image_path = image_path
         self.trailer_path = trailer_path
         self.reviews = reviews if reviews is not None else []
+        self.schema_version = schema_version
+        self.titles = titles if titles is not None else {}
+        self.descriptions = descriptions if descriptions is not None else {}
 
     def to_dict(self):
         """
@@ -50,7 +60,10 @@ class Film:
             "description": self.description,
             "image_path": self.image_path,
             "trailer_path": self.trailer_path,
-            "reviews": self.reviews
+            "reviews": self.reviews,
+            "schema_version": self.schema_version,
+            "titles": self.titles,
+            "descriptions": self.descriptions
         }
 
     @staticmethod
@@ -80,5 +93,8 @@ class Film:
             description=data.get("description"),
             image_path=data.get("image_path"),
             trailer_path=data.get("trailer_path"),
-            reviews=data.get("reviews", [])
+            reviews=data.get("reviews", []),
+            schema_version=data.get("schema_version", 1),
+            titles=data.get("titles", {}),
+            descriptions=data.get("descriptions", {})
         )
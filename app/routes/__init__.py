@@ -1,11 +1,19 @@
-from flask import Blueprint
-from .films import films_bp
-from .actors import actors_bp
-from .reviews import reviews_bp
+from importlib import import_module
 
+from services.startup import startup
+
+# Each blueprint module import is timed as a startup phase: (module, blueprint, url prefix)
+BLUEPRINTS = [
+    ("films", "films_bp", "/films"),
+    ("actors", "actors_bp", "/actors"),
+    ("reviews", "reviews_bp", "/films"),
+    ("metrics", "metrics_bp", "/metrics"),
+    ("health", "health_bp", "/health"),
+]
 
-def init_routes(app):
-    app.register_blueprint(films_bp, url_prefix="/films")
-    app.register_blueprint(actors_bp, url_prefix="/actors")
-    app.register_blueprint(reviews_bp, url_prefix="/films")
 
+def init_routes(app):
+    for module_name, blueprint_name, url_prefix in BLUEPRINTS:
+        with startup.phase(f"import.routes.{module_name}"):
+            module = import_module(f".{module_name}", __name__)
+        app.register_blueprint(getattr(module, blueprint_name), url_prefix=url_prefix)
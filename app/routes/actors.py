@@ -25,6 +25,9 @@ Dependencies:
 
 from flask import Blueprint, request, jsonify
 from services.db import mongo
+from services.extensions import span
+from services.film_store import LIGHT_FIELDS, localized_projection
+from services.localization import request_locale, film_response, localized_response
 from utils.validation import validate_actor
 from bson import ObjectId
 
@@ -41,9 +44,10 @@ def get_actors():
         Response: A JSON response with a list of actors and status code 200.
     """
     actors = list(mongo.db.actors.find())
-    for actor in actors:
-        actor["_id"] = str(actor["_id"])
-    return jsonify(actors), 200
+    with span("serialize.actors"):
+        for actor in actors:
+            actor["_id"] = str(actor["_id"])
+        return jsonify(actors), 200
 
 
 @actors_bp.route("/", methods=["POST"])
@@ -182,12 +186,14 @@ def get_films_by_actor(actor_id):
 
     try:
         film_object_ids = [ObjectId(film_id) for film_id in film_ids]
-        films = list(mongo.db.films.find({"_id": {"$in": film_object_ids}}))
+        locale = request_locale()
+        films = list(mongo.db.films.find({"_id": {"$in": film_object_ids}}, localized_projection(locale, LIGHT_FIELDS)))
 
-        for film in films:
-            film["_id"] = str(film["_id"])
+        with span("serialize.films", attributes={"films.count": len(films)}):
+            for film in films:
+                film_response(film, locale)
 
-        return jsonify({"_id": actor_id, "films": films}), 200
+            return localized_response({"_id": actor_id, "films": films}, locale)
 
     except Exception as e:
         return jsonify({"error": "Error retrieving films", "details": str(e)}), 500
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from bson import ObjectId
 from services.db import mongo
+from services.related import get_related, schedule_refresh
+from services import film_store
+from services.localization import request_locale, film_response, localized_response
+from services.extensions import get_extension, invalidate_cached_film, span
 from utils.validation import validate_film
 
 # Define the Blueprint
@@ -10,15 +14,44 @@ films_bp = Blueprint("films", __name__)
 @films_bp.route("/", methods=["GET"])
 def get_films():
     """
-    Retrieve all films from the database.
+    Retrieve all films from the database, without their heavy fields
+    (description, image and trailer paths, reviews), in the locale negotiated
+    from the `Accept-Language` header.
 
     Returns:
         Response: A JSON response with a list of films and status code 200.
     """
-    films = list(mongo.db.films.find())
-    for film in films:
-        film["_id"] = str(film["_id"])
-    return jsonify(films), 200
+    locale = request_locale()
+    films = list(mongo.db.films.find({}, film_store.localized_projection(locale, film_store.LIGHT_FIELDS)))
+    with span("serialize.films", attributes={"films.count": len(films)}):
+        for film in films:
+            film_response(film, locale)
+        return localized_response(films, locale)
+
+
+@films_bp.route("/top", methods=["GET"])
+def get_top_films():
+    """
+    Retrieve the best rated films in the locale negotiated from `Accept-Language`.
+
+    Served from the per-locale warm cache when it holds enough films.
+
+    Query Parameters:
+        limit (int, optional): Maximum number of films returned (default 20).
+    """
+    limit = request.args.get("limit", 20, type=int)
+    if limit <= 0:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    locale = request_locale()
+    locale_cache = get_extension("locale_cache")
+    films = locale_cache.get_top(locale, limit) if locale_cache else None
+    if films is None:
+        projection = film_store.localized_projection(locale, film_store.LIGHT_FIELDS)
+        films = list(mongo.db.films.find({}, projection).sort("rating", -1).limit(limit))
+        for film in films:
+            film_response(film, locale)
+    return localized_response(films, locale)
 
 
 @films_bp.route("/", methods=["POST"])
@@ -50,6 +83,7 @@ def add_films():
                     actor_updates[actor_id] = []
 
         film_data = {
+            "_id": ObjectId(),
             "title": film["title"],
             "actors": actor_ids,
             "release_year": film["release_year"],
@@ -60,11 +94,17 @@ def add_films():
             "trailer_path":film["trailer_path"],
             "reviews": []
         }
+        # Optional translations: {"<locale>": "<text>"}
+        for translations_field in film_store.LOCALIZED_FIELDS.values():
+            if translations_field in film:
+                if not isinstance(film[translations_field], dict):
+                    return jsonify({"error": f"Field '{translations_field}' must be an object"}), 400
+                film_data[translations_field] = film[translations_field]
         films_to_insert.append(film_data)
 
     if films_to_insert:
-        result = mongo.db.films.insert_many(films_to_insert)
-        inserted_ids = [str(film_id) for film_id in result.inserted_ids]
+        film_store.insert_films(mongo.db, films_to_insert)
+        inserted_ids = [str(film_data["_id"]) for film_data in films_to_insert]
 
         for film_data, film_id in zip(films_to_insert, inserted_ids):
             for actor_id in film_data["actors"]:
@@ -76,6 +116,9 @@ def add_films():
                 {"$push": {"films": {"$each": film_ids}}}
             )
 
+        invalidate_cached_film()
+        schedule_refresh(mongo.db, inserted_ids)
+
         return jsonify({
             "message": f"{len(inserted_ids)} films added",
             "film_ids": inserted_ids
@@ -87,13 +130,19 @@ def add_films():
 @films_bp.route("/<string:film_id>", methods=["GET"])
 def get_film_by_id(film_id):
     """
-    Retrieve details of a specific film by its MongoDB _id.
+    Retrieve details of a specific film by its MongoDB _id, in the locale
+    negotiated from `Accept-Language`. Hot films are served from the locale cache.
     """
     try:
-        film = mongo.db.films.find_one({"_id": ObjectId(film_id)})
+        locale = request_locale()
+        locale_cache = get_extension("locale_cache")
+        film = locale_cache.get_film(locale, film_id) if locale_cache else None
         if film:
-            film["_id"] = str(film["_id"])
-            return jsonify(film), 200
+            return localized_response(film, locale)
+
+        film = film_store.load_film(mongo.db, ObjectId(film_id), locale)
+        if film:
+            return localized_response(film_response(film, locale), locale)
         return jsonify({"error": "Film not found"}), 404
     except:
         return jsonify({"error": "Invalid Film ID"}), 400
@@ -111,15 +160,13 @@ def update_film(film_id):
                 actor_ids.append(str(actor["_id"]))
 
         data["actors"] = actor_ids
-        updated_film = mongo.db.films.find_one_and_update(
-            {"_id": ObjectId(film_id)},
-            {"$set": data},
-            return_document=True
-        )
+        locale = request_locale()
+        updated_film = film_store.update_film(mongo.db, ObjectId(film_id), data, locale)
 
         if updated_film:
-            updated_film["_id"] = str(updated_film["_id"])
-            return jsonify(updated_film), 200
+            invalidate_cached_film(film_id)
+            schedule_refresh(mongo.db, [film_id])
+            return localized_response(film_response(updated_film, locale), locale)
         return jsonify({"error": "Film not found"}), 404
 
     except:
@@ -133,9 +180,35 @@ def delete_film(film_id):
     Delete a specific film by its MongoDB _id.
     """
     try:
-        result = mongo.db.films.delete_one({"_id": ObjectId(film_id)})
-        if result.deleted_count > 0:
+        if film_store.delete_film(mongo.db, ObjectId(film_id)) > 0:
+            invalidate_cached_film(film_id)
+            schedule_refresh(mongo.db, [film_id])
             return "", 204
         return jsonify({"error": "Film not found"}), 404
     except:
         return jsonify({"error": "Invalid Film ID"}), 400
+
+
+@films_bp.route("/<string:film_id>/related", methods=["GET"])
+def get_related_films(film_id):
+    """
+    Retrieve the films sharing cast members with a film, best matches first.
+
+    Served from the precomputed `related_films` index with a single read.
+
+    Query Parameters:
+        limit (int, optional): Maximum number of films returned (default 10).
+    """
+    try:
+        film_object_id = ObjectId(film_id)
+    except Exception:
+        return jsonify({"error": "Invalid Film ID format"}), 400
+
+    limit = request.args.get("limit", 10, type=int)
+    if limit <= 0:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    related = get_related(mongo.db, film_object_id, limit)
+    if related is None:
+        return jsonify({"error": "Film not found or not indexed yet"}), 404
+    return jsonify({"_id": film_id, "related": related}), 200
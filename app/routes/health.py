@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify
+from services.startup import startup
+
+health_bp = Blueprint("health", __name__)
+
+
+@health_bp.route("/live", methods=["GET"])
+def liveness():
+    """ The process is up and serving HTTP. """
+    return jsonify({"status": "alive"}), 200
+
+
+@health_bp.route("/ready", methods=["GET"])
+def readiness():
+    """ Ready once the MongoDB connection pool has been warmed up. """
+    report = startup.report()
+    return jsonify(report), 200 if report["ready"] else 503
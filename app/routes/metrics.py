@@ -0,0 +1,10 @@
+from flask import Blueprint, jsonify
+from services.metrics import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/", methods=["GET"])
+def get_metrics():
+    """ Return a snapshot of the in-process counters and gauges. """
+    return jsonify(metrics.snapshot()), 200
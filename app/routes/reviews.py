@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from bson import ObjectId
 from services.db import mongo
+from services.film_store import add_review_ids, remove_review_id
+from services.extensions import get_extension, invalidate_cached_film
 
 reviews_bp = Blueprint("reviews", __name__)
 
@@ -12,7 +14,7 @@ def get_reviews(film_id):
     except Exception:
         return jsonify({"error": "Invalid Film ID format"}), 400
 
-    film = mongo.db.films.find_one({"_id": film_object_id})
+    film = mongo.db.films.find_one({"_id": film_object_id}, {"_id": 1})
     if not film:
         return jsonify({"error": "Film not found"}), 404
 
@@ -33,7 +35,17 @@ def get_reviews(film_id):
 
 @reviews_bp.route("/<string:film_id>/reviews", methods=["POST"])
 def add_review(film_id):
-    """ Add a new review for a specific film. """
+    """
+    Add a new review for a specific film.
+
+    With `REVIEW_WRITE_BEHIND` the review is queued and written in a later batch:
+    the response is `202` with the final review id, or `503` when the queue is full.
+    Bodies larger than `REVIEW_MAX_BYTES` are rejected with `413`.
+    """
+    max_bytes = current_app.config.get("REVIEW_MAX_BYTES", 10000)
+    if len(request.get_data()) > max_bytes:
+        return jsonify({"error": f"Review body exceeds {max_bytes} bytes"}), 413
+
     data = request.json
 
     try:
@@ -41,7 +53,7 @@ def add_review(film_id):
     except Exception:
         return jsonify({"error": "Invalid Film ID format"}), 400
 
-    film = mongo.db.films.find_one({"_id": film_object_id})
+    film = mongo.db.films.find_one({"_id": film_object_id}, {"_id": 1})
     if not film:
         return jsonify({"error": "Film not found"}), 404
 
@@ -51,6 +63,8 @@ def add_review(film_id):
 
     if not profile_id or not nickname or not text:
         return jsonify({"error": "Missing required fields"}), 400
+    if not all(isinstance(field, str) for field in (profile_id, nickname, text)):
+        return jsonify({"error": "profile_id, nickname and text must be strings"}), 400
 
     review_data = {
         "film_id": film_id,
@@ -59,13 +73,20 @@ def add_review(film_id):
         "text": text
     }
 
+    review_queue = get_extension("review_queue")
+    if review_queue is not None:
+        review_data["_id"] = ObjectId()
+        if not review_queue.submit(review_data):
+            response = jsonify({"error": "Too many pending reviews, retry later"})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        return jsonify({"message": "Review accepted", "review_id": str(review_data["_id"])}), 202
+
     result = mongo.db.reviews.insert_one(review_data)
     review_id = str(result.inserted_id)
 
-    mongo.db.films.update_one(
-        {"_id": film_object_id},
-        {"$push": {"reviews": review_id}}
-    )
+    add_review_ids(mongo.db, {film_object_id: [review_id]})
+    invalidate_cached_film(film_id, top=False)
 
     return jsonify({"message": "Review added", "review_id": review_id}), 201
 
@@ -135,7 +156,7 @@ def delete_review(film_id, review_id):
     except Exception:
         return jsonify({"error": "Invalid ID format"}), 400
 
-    film = mongo.db.films.find_one({"_id": film_object_id})
+    film = mongo.db.films.find_one({"_id": film_object_id}, {"_id": 1})
     if not film:
         return jsonify({"error": "Film not found"}), 404
 
@@ -145,9 +166,7 @@ def delete_review(film_id, review_id):
 
     mongo.db.reviews.delete_one({"_id": review_object_id})
 
-    mongo.db.films.update_one(
-        {"_id": film_object_id},
-        {"$pull": {"reviews": review_id}}
-    )
+    remove_review_id(mongo.db, film_object_id, review_id)
+    invalidate_cached_film(film_id, top=False)
 
     return jsonify({"message": "Review deleted"}), 204
@@ -1,10 +1,16 @@
+import os
+
 from flask_pymongo import PyMongo
 
+# Database of the service, also used by the command line tools in `app/tools`
+DEFAULT_URI = os.environ.get("MONGO_URI", "mongodb://content_mongodb:27017/contentdb")
+DUPLICATE_KEY_ERROR = 11000
+
 mongo = PyMongo()
 
 """
 method that calls the init of the DB
 """
 
-def init_db(app):
-    mongo.init_app(app)
+def init_db(app, event_listeners=None):
+    mongo.init_app(app, event_listeners=event_listeners or [])
@@ -0,0 +1,59 @@
+"""
+Optional Subsystem Lookup
+
+Tracing, the review write-behind queue and the locale cache are optional. Their
+modules are only imported by `create_app` when their configuration flag is on,
+and their `init_*` function then registers the shared object in
+`app.extensions`. Routes reach them through the helpers below instead of
+importing the modules, so a disabled subsystem is never loaded.
+
+Functions:
+    - `get_extension(name)`: The object registered as `name`, or None when disabled.
+    - `span(name, attributes)`: Trace the enclosed block when tracing is on.
+    - `invalidate_cached_film(film_id, top)`: Drop cached copies of a film when the locale cache is on.
+    - `invalidate_reviewed_films(app, film_ids)`: Review queue flush callback doing the same
+      for films that got reviews written behind.
+"""
+
+from contextlib import nullcontext
+
+from flask import current_app
+
+
+def get_extension(name):
+    """
+    Return the optional subsystem registered as `name` on the current app, or None.
+    """
+    return current_app.extensions.get(name)
+
+
+def span(name, attributes=None):
+    """
+    Return a context manager tracing the enclosed block as span `name`.
+    """
+    tracer = get_extension("tracer")
+    if tracer is None:
+        return nullcontext()
+    return tracer.span(name, attributes=attributes)
+
+
+def invalidate_cached_film(film_id=None, top=True):
+    """
+    Drop the locale cache entries of `film_id` after a write, and the cached top
+    lists unless `top` is False. See `LocaleCache.invalidate`.
+    """
+    locale_cache = get_extension("locale_cache")
+    if locale_cache is not None:
+        locale_cache.invalidate(film_id, top)
+
+
+def invalidate_reviewed_films(app, film_ids):
+    """
+    Drop the cached details of films whose reviews were written behind, as the
+    synchronous review path does. Runs in the review flusher thread, outside any
+    app context.
+    """
+    locale_cache = app.extensions.get("locale_cache")
+    if locale_cache is not None:
+        for film_id in film_ids:
+            locale_cache.invalidate(film_id, top=False)
@@ -0,0 +1,237 @@
+"""
+Film Storage Layout
+
+This module owns how film documents are laid out in MongoDB. Since schema
+version 2, a film is split in two documents sharing the same `_id`:
+
+    - `films`: The small fields used by list views (`title`, `actors`,
+      `release_year`, `genre`, `rating`) and `schema_version`.
+    - `film_details`: The heavy fields (`description`, `image_path`,
+      `trailer_path`, `reviews`, `descriptions`), only loaded by detail views.
+
+Localized titles and descriptions are stored as `titles` and `descriptions` maps
+(locale -> text) next to the default `title` and `description`. Reads for one
+locale use `localized_projection` so that only that locale leaves the database.
+
+Documents written before version 2 have no `schema_version` and keep every field
+in `films`. All functions here accept both layouts, so the service works while
+`python -m app.tools.migrate_films` converts the collection in bounded batches.
+List views use `LIST_PROJECTION`, which excludes the heavy fields in both layouts.
+
+The module only depends on pymongo so it can be used by the API and by the tools.
+
+Functions:
+    - `split_film(film)`: Split a complete film into its light and heavy documents.
+    - `insert_films(db, films)`: Store new films in the current layout.
+    - `localized_projection(locale, fields)`: Projection of `fields` with one locale only.
+    - `load_film(db, film_id, locale)`: Read a complete film, whatever its layout.
+    - `load_details(db, films, locale)`: Merge the heavy fields into a list of films.
+    - `update_film(db, film_id, fields, locale)`: Update any field of a film.
+    - `delete_film(db, film_id)`: Delete a film and its details.
+    - `add_review_ids(db, review_ids_by_film)`: Append review ids to film review lists.
+    - `remove_review_id(db, film_id, review_id)`: Remove a review id from a film.
+    - `migrate_batch(db, batch_size)`: Convert up to `batch_size` legacy films.
+"""
+
+from pymongo import UpdateOne
+
+SCHEMA_VERSION = 2
+LIGHT_FIELDS = ["title", "actors", "release_year", "genre", "rating", "schema_version"]
+# Storage bookkeeping read with the films but never returned by the API
+INTERNAL_FIELDS = ["schema_version"]
+HEAVY_FIELDS = ["description", "image_path", "trailer_path", "reviews", "descriptions"]
+LIST_PROJECTION = {field: 0 for field in HEAVY_FIELDS}
+
+# Field -> map of its translations by locale
+LOCALIZED_FIELDS = {"title": "titles", "description": "descriptions"}
+
+LEGACY_FILTER = {"schema_version": {"$exists": False}}
+
+
+def split_film(film):
+    """
+    Split a complete film document into `(light, details)`.
+
+    Both documents keep the film `_id` when it is set.
+    """
+    light = {key: value for key, value in film.items() if key not in HEAVY_FIELDS}
+    light["schema_version"] = SCHEMA_VERSION
+    details = {field: film[field] for field in HEAVY_FIELDS if field in film}
+    details.setdefault("reviews", [])
+    if "_id" in film:
+        details["_id"] = film["_id"]
+    return light, details
+
+
+def localized_projection(locale, fields):
+    """
+    Return an inclusion projection of `fields` keeping only the `locale` translations.
+    """
+    projection = {field: 1 for field in fields if field not in LOCALIZED_FIELDS.values()}
+    for field, translations in LOCALIZED_FIELDS.items():
+        if field in fields:
+            projection[f"{translations}.{locale}"] = 1
+    return projection
+
+
+def insert_films(db, films, ordered=True):
+    """
+    Insert complete film documents, each with its `_id` already set.
+
+    Details are written first so that a film is never visible without them.
+    """
+    lights, details = zip(*(split_film(film) for film in films))
+    db.film_details.insert_many(list(details), ordered=ordered)
+    db.films.insert_many(list(lights), ordered=ordered)
+
+
+def load_film(db, film_id, locale=None):
+    """
+    Return the complete film `film_id` (an ObjectId), or None if it does not exist.
+
+    With `locale`, only the translations of that locale are read.
+    """
+    projection, details_projection = None, {"_id": 0}
+    if locale:
+        projection = localized_projection(locale, LIGHT_FIELDS + HEAVY_FIELDS)
+        details_projection = dict(localized_projection(locale, HEAVY_FIELDS), _id=0)
+
+    film = db.films.find_one({"_id": film_id}, projection)
+    if film is None or film.get("schema_version", 1) < SCHEMA_VERSION:
+        return film
+    details = db.film_details.find_one({"_id": film_id}, details_projection) or {"reviews": []}
+    film.update(details)
+    return film
+
+
+def load_details(db, films, locale=None):
+    """
+    Add the heavy fields to a list of films read without them, in one query.
+
+    With `locale`, only the translations of that locale are read.
+    """
+    projection = localized_projection(locale, HEAVY_FIELDS) if locale else {field: 1 for field in HEAVY_FIELDS}
+    ids = [film["_id"] for film in films]
+    details_by_id = {details["_id"]: details for details in db.film_details.find({"_id": {"$in": ids}}, projection)}
+    legacy_ids = [film["_id"] for film in films if film.get("schema_version", 1) < SCHEMA_VERSION]
+    if legacy_ids:
+        for legacy in db.films.find({"_id": {"$in": legacy_ids}}, projection):
+            details_by_id[legacy["_id"]] = legacy
+
+    for film in films:
+        details = details_by_id.get(film["_id"], {})
+        for field in HEAVY_FIELDS:
+            film[field] = details.get(field, [] if field == "reviews" else None)
+    return films
+
+
+def update_film(db, film_id, fields, locale=None):
+    """
+    Apply `$set` of `fields` to the film `film_id`, in whichever layout it is stored.
+
+    With `locale`, the updated film is read with only that locale's translations.
+
+    Returns:
+        dict: The complete updated film, or None if it does not exist.
+    """
+    film = db.films.find_one({"_id": film_id}, {"schema_version": 1})
+    if film is None:
+        return None
+
+    if film.get("schema_version", 1) < SCHEMA_VERSION:
+        light, heavy = fields, {}
+    else:
+        light = {key: value for key, value in fields.items() if key not in HEAVY_FIELDS}
+        heavy = {key: value for key, value in fields.items() if key in HEAVY_FIELDS}
+
+    if light:
+        db.films.update_one({"_id": film_id}, {"$set": light})
+    if heavy:
+        db.film_details.update_one({"_id": film_id}, {"$set": heavy}, upsert=True)
+    return load_film(db, film_id, locale)
+
+
+def delete_film(db, film_id):
+    """
+    Delete the film `film_id` and its details.
+
+    Returns:
+        int: Number of deleted films (0 or 1).
+    """
+    deleted = db.films.delete_one({"_id": film_id}).deleted_count
+    if deleted:
+        db.film_details.delete_one({"_id": film_id})
+    return deleted
+
+
+def _update_reviews(db, updates):
+    """
+    Apply review list updates ({film ObjectId: update}) to both layouts.
+
+    Each update only matches the document holding the list: the `film_details`
+    of migrated films, or the legacy `films` document.
+    """
+    if not updates:
+        return
+    db.film_details.bulk_write([UpdateOne({"_id": film_id}, update) for film_id, update in updates.items()],
+                               ordered=False)
+    db.films.bulk_write([UpdateOne(dict(LEGACY_FILTER, _id=film_id), update) for film_id, update in updates.items()],
+                        ordered=False)
+
+
+def add_review_ids(db, review_ids_by_film, operator="$push"):
+    """
+    Append review ids to film review lists.
+
+    Args:
+        review_ids_by_film (dict): Film ObjectId -> list of review ids (str).
+        operator (str): `"$push"`, or `"$addToSet"` for idempotent retries.
+    """
+    _update_reviews(db, {film_id: {operator: {"reviews": {"$each": review_ids}}}
+                         for film_id, review_ids in review_ids_by_film.items()})
+
+
+def remove_review_id(db, film_id, review_id):
+    """
+    Remove a review id from the review list of the film `film_id`.
+    """
+    _update_reviews(db, {film_id: {"$pull": {"reviews": review_id}}})
+
+
+def migrate_batch(db, batch_size=500):
+    """
+    Convert up to `batch_size` legacy films to the current layout.
+
+    Heavy fields are copied to `film_details` first, then removed from `films`
+    only if they did not change in the meantime; films modified concurrently are
+    left untouched and picked up by a later batch. Running it again after an
+    interruption is safe.
+
+    Returns:
+        tuple: `(found, migrated)` film counts for this batch.
+    """
+    legacy_films = list(db.films.find(LEGACY_FILTER, limit=batch_size))
+    if not legacy_films:
+        return 0, 0
+
+    details_operations, film_operations = [], []
+    for film in legacy_films:
+        _, details = split_film(film)
+        reviews = details.pop("reviews")
+        details.pop("_id", None)
+        # $addToSet keeps reviews already added to the details by a previous attempt
+        details_operations.append(UpdateOne(
+            {"_id": film["_id"]},
+            {"$set": details, "$addToSet": {"reviews": {"$each": reviews}}},
+            upsert=True
+        ))
+
+        unchanged = {field: film[field] if field in film else {"$exists": False} for field in HEAVY_FIELDS}
+        film_operations.append(UpdateOne(
+            dict(LEGACY_FILTER, _id=film["_id"], **unchanged),
+            {"$unset": {field: "" for field in HEAVY_FIELDS}, "$set": {"schema_version": SCHEMA_VERSION}}
+        ))
+
+    db.film_details.bulk_write(details_operations, ordered=False)
+    result = db.films.bulk_write(film_operations, ordered=False)
+    return len(legacy_films), result.modified_count
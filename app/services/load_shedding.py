@@ -0,0 +1,153 @@
+"""
+Adaptive Load Shedding
+
+This module rejects requests early with `503 Service Unavailable` and a
+`Retry-After` header when the service is saturated, instead of queueing them
+until they time out. Two signals are watched:
+
+    - The number of requests currently being handled by this process.
+    - The time requests wait to check a connection out of the MongoDB pool,
+      measured by `PoolWaitMonitor` through pymongo connection pool monitoring
+      and smoothed with an exponentially decaying average.
+
+Configuration (Flask `app.config`):
+    - `LOAD_SHED_ENABLED` (bool): Turn load shedding on or off.
+    - `LOAD_SHED_MAX_IN_FLIGHT` (int): Maximum concurrent requests per process.
+    - `LOAD_SHED_MAX_POOL_WAIT_MS` (float): Maximum smoothed pool wait time.
+    - `LOAD_SHED_RETRY_AFTER` (int): Seconds suggested to shed clients.
+
+Objects:
+    - `pool_monitor`: The shared `PoolWaitMonitor`, passed to `init_db` as event listener.
+
+Functions:
+    - `init_load_shedding(app)`: Register the load shedder on the Flask app.
+"""
+
+import threading
+import time
+
+from flask import g, request, jsonify
+from pymongo.monitoring import ConnectionPoolListener
+
+from services.metrics import EXEMPT_BLUEPRINTS, metrics
+
+
+class PoolWaitMonitor(ConnectionPoolListener):
+    """
+    Connection pool listener tracking how long checkouts wait for a connection.
+
+    The average decays with a half-life of `half_life` seconds, so it falls back
+    to zero once the pool is no longer contended even if shedding stops traffic.
+    """
+
+    def __init__(self, half_life=2.0, alpha=0.2):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._half_life = half_life
+        self._alpha = alpha
+        self._average_ms = 0.0
+        self._updated_at = time.monotonic()
+
+    def current_wait_ms(self):
+        """
+        Return the smoothed checkout wait time in milliseconds.
+        """
+        with self._lock:
+            return self._decayed(time.monotonic())
+
+    def _decayed(self, now):
+        return self._average_ms * 0.5 ** ((now - self._updated_at) / self._half_life)
+
+    def _record(self, wait_ms):
+        now = time.monotonic()
+        with self._lock:
+            average = self._decayed(now)
+            self._average_ms = average + self._alpha * (wait_ms - average)
+            self._updated_at = now
+        metrics.set_gauge("mongo.pool_wait_ms", round(self._average_ms, 3))
+
+    def connection_check_out_started(self, event):
+        self._local.started_at = time.monotonic()
+
+    def connection_checked_out(self, event):
+        started_at = getattr(self._local, "started_at", None)
+        if started_at is not None:
+            self._record((time.monotonic() - started_at) * 1000)
+            self._local.started_at = None
+
+    def connection_check_out_failed(self, event):
+        metrics.incr("mongo.pool_checkout_failed")
+        self.connection_checked_out(event)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+pool_monitor = PoolWaitMonitor()
+
+
+def init_load_shedding(app, monitor=pool_monitor):
+    """
+    Register the in-flight counter and the shedding check on the Flask app.
+    """
+    if not app.config.get("LOAD_SHED_ENABLED", True):
+        return
+
+    max_in_flight = app.config.get("LOAD_SHED_MAX_IN_FLIGHT", 64)
+    max_pool_wait_ms = app.config.get("LOAD_SHED_MAX_POOL_WAIT_MS", 250.0)
+    retry_after = app.config.get("LOAD_SHED_RETRY_AFTER", 1)
+    lock = threading.Lock()
+    state = {"in_flight": 0}
+
+    @app.before_request
+    def shed_load():
+        if request.blueprint in EXEMPT_BLUEPRINTS:
+            return None
+
+        with lock:
+            overloaded = state["in_flight"] >= max_in_flight
+            if not overloaded:
+                state["in_flight"] += 1
+                g.load_shed_counted = True
+            metrics.set_gauge("http.in_flight", state["in_flight"])
+
+        if overloaded:
+            reason = "in_flight"
+        elif monitor.current_wait_ms() > max_pool_wait_ms:
+            reason = "pool_wait"
+        else:
+            return None
+
+        metrics.incr("load_shed.rejected")
+        metrics.incr(f"load_shed.rejected.{reason}")
+        response = jsonify({"error": "Service overloaded, retry later"})
+        response.headers["Retry-After"] = str(retry_after)
+        return response, 503
+
+    @app.teardown_request
+    def release_slot(exc):
+        if g.pop("load_shed_counted", False):
+            with lock:
+                state["in_flight"] -= 1
+                metrics.set_gauge("http.in_flight", state["in_flight"])
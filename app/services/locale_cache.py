@@ -0,0 +1,175 @@
+"""
+Per-Locale Warm Cache of the Top Films
+
+This module keeps, for every supported locale, the `LOCALE_CACHE_SIZE` best rated
+films already localized, both as list entries and as complete detail documents.
+A background thread refreshes every locale each `LOCALE_CACHE_TTL` seconds,
+reading with the `LOCALE_CACHE_READ_PREFERENCE` read preference (`nearest` by
+default) so that regional nodes warm their cache from the closest replica set
+member and serve the hot set without reaching the primary.
+
+Writes made through this process invalidate the cache at once: the detail entry
+of the written film is dropped, and film additions, updates and deletions also
+drop the top lists, so reads fall back to the database until the refresh thread,
+woken by the invalidation, rebuilds them (at most once per
+`REFRESH_DEBOUNCE` seconds). That rebuild reads from the primary: a lagging
+secondary could still return the data before the write and cache it again until
+the next periodic refresh. A generation counter keeps a refresh that started
+before an invalidation from storing what it read. Other replicas see the change
+at their next periodic refresh, at most `LOCALE_CACHE_TTL` seconds later.
+
+Objects:
+    - `locale_cache`: The shared `LocaleCache` of the process.
+
+Functions:
+    - `init_locale_cache(app)`: Configure the cache, start the refresh thread and
+      register it as the `locale_cache` app extension.
+"""
+
+import threading
+import time
+
+from pymongo import DESCENDING, ReadPreference
+
+from services.film_store import LIGHT_FIELDS, load_details, localized_projection
+from services.localization import film_response
+from services.metrics import metrics
+
+# Minimum delay between two refreshes triggered by invalidations
+REFRESH_DEBOUNCE = 1.0
+
+
+class LocaleCache:
+    """
+    Top rated films per locale, localized and ready to be serialized.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.size = 100
+        self._lock = threading.Lock()
+        self._top = {}
+        self._films = {}
+        # Bumped by every invalidation, and by those affecting the top lists
+        self._generation = 0
+        self._top_generation = 0
+        self._refresh = threading.Event()
+
+    def warm(self, db, locale):
+        """
+        Load the top films of `locale`: one sorted list query and one details query.
+
+        Results are discarded when an invalidation happened while they were read.
+        """
+        with self._lock:
+            generation, top_generation = self._generation, self._top_generation
+        films = list(db.films.find({}, localized_projection(locale, LIGHT_FIELDS))
+                     .sort("rating", DESCENDING).limit(self.size))
+        # Copies: `load_details` still needs the stored fields of `films`
+        top = [film_response(dict(film), locale) for film in films]
+
+        details = {}
+        for film in load_details(db, films, locale):
+            film_response(film, locale)
+            details[film["_id"]] = film
+
+        with self._lock:
+            if top_generation != self._top_generation:
+                metrics.incr("locale_cache.stale_refresh")
+                return
+            self._top[locale] = top
+            if generation == self._generation:
+                self._films[locale] = details
+        metrics.set_gauge(f"locale_cache.{locale}.films", len(top))
+
+    def get_top(self, locale, limit):
+        """
+        Return the `limit` best rated films of `locale`, or None if not cached.
+        """
+        with self._lock:
+            top = self._top.get(locale)
+        # A list shorter than `size` holds every film, so any limit can be served
+        if top is None or (limit > len(top) and len(top) == self.size):
+            metrics.incr("locale_cache.miss")
+            return None
+        metrics.incr("locale_cache.hit")
+        return top[:limit]
+
+    def get_film(self, locale, film_id):
+        """
+        Return the cached detail document of `film_id` in `locale`, or None.
+        """
+        with self._lock:
+            film = self._films.get(locale, {}).get(film_id)
+        metrics.incr("locale_cache.hit" if film is not None else "locale_cache.miss")
+        return film
+
+    def invalidate(self, film_id=None, top=True):
+        """
+        Drop the detail entries of `film_id` in every locale and, unless `top` is
+        False (the change cannot affect list fields), the top lists.
+
+        The refresh thread is woken to rebuild what was dropped.
+        """
+        with self._lock:
+            self._generation += 1
+            if film_id is not None:
+                for films in self._films.values():
+                    films.pop(film_id, None)
+            if top:
+                self._top_generation += 1
+                self._top.clear()
+        self._refresh.set()
+
+    def start(self, db, locales, ttl, primary_db=None):
+        """
+        Refresh every locale now, then every `ttl` seconds or soon after an invalidation.
+
+        Periodic refreshes read from `db`, refreshes triggered by an invalidation
+        from `primary_db` (defaults to `db`), which has seen the invalidating write.
+        """
+        self.enabled = True
+        primary_db = db if primary_db is None else primary_db
+
+        def refresh():
+            try:
+                primary_db.films.create_index([("rating", DESCENDING)])
+            except Exception:
+                metrics.incr("locale_cache.refresh_failed")
+            source = db
+            while True:
+                self._refresh.clear()
+                for locale in locales:
+                    try:
+                        self.warm(source, locale)
+                    except Exception:
+                        metrics.incr("locale_cache.refresh_failed")
+                if self._refresh.wait(ttl):
+                    # Woken by an invalidation: let a burst of writes settle first
+                    time.sleep(REFRESH_DEBOUNCE)
+                    source = primary_db
+                else:
+                    source = db
+
+        threading.Thread(target=refresh, name="locale-cache", daemon=True).start()
+
+
+locale_cache = LocaleCache()
+
+
+def init_locale_cache(app):
+    """
+    Configure the shared locale cache from `app.config` and start refreshing it.
+    """
+    if not app.config.get("LOCALE_CACHE_ENABLED", True):
+        return
+
+    from services.db import mongo
+
+    preference = getattr(ReadPreference, app.config.get("LOCALE_CACHE_READ_PREFERENCE", "nearest").upper())
+    db = mongo.cx.get_database(mongo.db.name, read_preference=preference)
+    primary_db = mongo.cx.get_database(mongo.db.name, read_preference=ReadPreference.PRIMARY)
+    locale_cache.size = app.config.get("LOCALE_CACHE_SIZE", 100)
+    locale_cache.start(db, app.config.get("SUPPORTED_LOCALES", ["en"]), app.config.get("LOCALE_CACHE_TTL", 60),
+                       primary_db)
+    app.extensions["locale_cache"] = locale_cache
@@ -0,0 +1,63 @@
+"""
+Localized Film Reads
+
+This module selects the locale of a request from its `Accept-Language` header and
+turns films read with `film_store.localized_projection` into their localized
+representation: `title` and `description` are replaced by their translation when
+one exists, and the translation maps are removed from the response.
+
+Configuration (Flask `app.config`):
+    - `SUPPORTED_LOCALES` (list): Locales the catalog is translated to.
+    - `DEFAULT_LOCALE` (str): Locale of the untranslated `title` and `description`.
+
+Functions:
+    - `request_locale()`: Negotiate the locale of the current request.
+    - `localize_film(film, locale)`: Apply the translations of `locale` to a film.
+    - `film_response(film, locale)`: Turn a stored film into its localized API representation.
+    - `localized_response(payload, locale)`: JSON response with content negotiation headers.
+"""
+
+from flask import current_app, jsonify, request
+
+from services.film_store import INTERNAL_FIELDS, LOCALIZED_FIELDS
+
+
+def request_locale():
+    """
+    Return the supported locale best matching the `Accept-Language` header.
+    """
+    supported = current_app.config.get("SUPPORTED_LOCALES", ["en"])
+    default = current_app.config.get("DEFAULT_LOCALE", supported[0])
+    return request.accept_languages.best_match(supported, default=default)
+
+
+def localize_film(film, locale):
+    """
+    Replace the localized fields of `film` by their `locale` translation, in place.
+    """
+    for field, translations_field in LOCALIZED_FIELDS.items():
+        translations = film.pop(translations_field, None) or {}
+        if translations.get(locale):
+            film[field] = translations[locale]
+    return film
+
+
+def film_response(film, locale):
+    """
+    Localize `film` in place, stringify its `_id` and drop storage-only fields.
+    """
+    film["_id"] = str(film["_id"])
+    for field in INTERNAL_FIELDS:
+        film.pop(field, None)
+    return localize_film(film, locale)
+
+
+def localized_response(payload, locale, status=200):
+    """
+    Return `payload` as JSON, declaring its language and that it varies with `Accept-Language`.
+    """
+    response = jsonify(payload)
+    response.status_code = status
+    response.headers["Content-Language"] = locale
+    response.headers.add("Vary", "Accept-Language")
+    return response
@@ -0,0 +1,53 @@
+"""
+In-Process Metrics Registry
+
+This module provides a tiny thread-safe registry of counters and gauges used by
+the service to expose operational numbers (shed requests, rate limited clients,
+in-flight requests, ...) through the `/metrics` endpoint.
+
+Objects:
+    - `metrics`: The shared `Metrics` instance used across the application.
+"""
+
+import threading
+
+# Endpoints used by probes and monitoring are never rate limited nor shed.
+EXEMPT_BLUEPRINTS = {"metrics", "health"}
+
+
+class Metrics:
+    """
+    Thread-safe registry of named counters and gauges.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+
+    def incr(self, name, value=1):
+        """
+        Increment the counter `name` by `value`.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        """
+        Set the gauge `name` to `value`.
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self):
+        """
+        Return a copy of all counters and gauges.
+
+        Returns:
+            dict: `{"counters": {...}, "gauges": {...}}`
+        """
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+
+metrics = Metrics()
@@ -0,0 +1,231 @@
+"""
+Per-Client Token Bucket Rate Limiting
+
+This module protects the API from clients that hammer the catalog (e.g. scrapers
+looping on `GET /films` or bulk `POST /films`). Every request is mapped to a
+client key and a route class, and consumes one token from the bucket identified
+by that pair. When the bucket is empty the request is rejected with `429` and a
+`Retry-After` header.
+
+Route classes:
+    - `read`: Every `GET` request.
+    - `write`: `PUT`, `DELETE` and single-item `POST` requests.
+    - `bulk`: `POST /films` and `POST /actors`, which insert whole lists.
+
+Backends:
+    - `memory`: Buckets live in this process (default). Each container enforces
+      its own limits.
+    - `mongo`: Buckets live in the `rate_limits` collection and are updated with a
+      single atomic `find_one_and_update`, so every replica shares the same limits.
+      Bucket times come from the server clock (`$$NOW`), and a TTL index on
+      `updated_at` removes buckets idle for `RATE_LIMIT_BUCKET_TTL` seconds.
+      When the collection cannot be reached, requests are allowed and counted
+      as `rate_limit.backend_error`.
+
+Configuration (Flask `app.config`):
+    - `RATE_LIMIT_ENABLED` (bool): Turn the limiter on or off (off by default).
+    - `RATE_LIMIT_BACKEND` (str): `"memory"` or `"mongo"`.
+    - `RATE_LIMITS` (dict): Route class -> `(capacity, refill_per_second)`.
+    - `RATE_LIMIT_TRUSTED_PROXIES` (int): Number of reverse proxies in front of the
+      API that append to `X-Forwarded-For`. The client key is the address appended
+      by the outermost trusted proxy; 0 (default) uses the remote address.
+    - `RATE_LIMIT_BUCKET_TTL` (int): Seconds after which an idle Mongo bucket expires.
+    - `RATE_LIMIT_MAX_KEYS` (int): Maximum number of buckets kept by the memory backend.
+
+Functions:
+    - `init_rate_limit(app)`: Register the limiter on the Flask app.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request, jsonify
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from services.metrics import EXEMPT_BLUEPRINTS, metrics
+
+# Route class -> (bucket capacity, tokens refilled per second)
+DEFAULT_LIMITS = {
+    "read": (120, 20.0),
+    "write": (30, 5.0),
+    "bulk": (5, 0.1),
+}
+
+BULK_ENDPOINTS = {"films.add_films", "actors.add_actors"}
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBucketStore:
+    """
+    Token buckets kept in process memory, bounded to `max_keys` entries (LRU).
+    """
+
+    def __init__(self, max_keys=100000):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self._max_keys = max_keys
+
+    def consume(self, key, capacity, refill_rate):
+        """
+        Take one token from the bucket `key`.
+
+        Args:
+            key (str): Bucket identifier.
+            capacity (int): Maximum number of tokens in the bucket.
+            refill_rate (float): Tokens added per second.
+
+        Returns:
+            tuple: `(allowed, retry_after)` where `retry_after` is the number of
+            seconds until a token becomes available (0 when allowed).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+            if tokens >= 1:
+                allowed = True
+                tokens -= 1
+            else:
+                allowed = False
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+
+        return allowed, _retry_after(tokens, allowed, refill_rate)
+
+
+class MongoBucketStore:
+    """
+    Token buckets shared by all replicas through a MongoDB collection.
+
+    The refill and the consumption are computed server side with an update
+    pipeline, so concurrent requests from different replicas never race, and
+    elapsed time is measured with the server clock so replica clock skew does
+    not add or remove tokens.
+    """
+
+    def __init__(self, collection, bucket_ttl=3600):
+        self._collection = collection
+        try:
+            # A bucket idle for longer than its refill time is full, so dropping it changes nothing
+            collection.create_index("updated_at", expireAfterSeconds=bucket_ttl)
+        except PyMongoError as e:
+            logger.warning("Could not create the rate_limits TTL index: %s", e)
+
+    def consume(self, key, capacity, refill_rate):
+        """
+        Take one token from the bucket `key`. See `MemoryBucketStore.consume`.
+        """
+        # Buckets written before `updated_at` became a date start over as full
+        updated_at = {"$cond": [{"$eq": [{"$type": "$updated_at"}, "date"]}, "$updated_at", "$$NOW"]}
+        elapsed = {"$divide": [{"$subtract": ["$$NOW", updated_at]}, 1000]}
+        refilled = {"$min": [capacity, {"$add": [
+            {"$ifNull": ["$tokens", capacity]},
+            {"$multiply": [elapsed, refill_rate]}
+        ]}]}
+        bucket = self._collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": "$$NOW"}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]}
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        allowed = bucket["allowed"]
+        return allowed, _retry_after(bucket["tokens"], allowed, refill_rate)
+
+
+def _retry_after(tokens, allowed, refill_rate):
+    if allowed or refill_rate <= 0:
+        return 0
+    return (1 - tokens) / refill_rate
+
+
+def route_class():
+    """
+    Classify the current request as `read`, `write` or `bulk`.
+    """
+    if request.endpoint in BULK_ENDPOINTS:
+        return "bulk"
+    if request.method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+
+def client_key(trusted_proxies=0):
+    """
+    Return the identifier of the client that sent the current request.
+
+    Only the last `trusted_proxies` `X-Forwarded-For` entries were appended by our
+    own proxies; anything before them is set by the client and ignored.
+    """
+    if trusted_proxies > 0:
+        hops = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return request.remote_addr or "unknown"
+
+
+def init_rate_limit(app):
+    """
+    Register the token bucket limiter as a `before_request` hook.
+
+    The Mongo backend collection is resolved lazily on the first request, so the
+    limiter can be registered before the database is initialized.
+    """
+    if not app.config.get("RATE_LIMIT_ENABLED", False):
+        return
+
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(app.config.get("RATE_LIMITS", {}))
+    trusted_proxies = app.config.get("RATE_LIMIT_TRUSTED_PROXIES", 0)
+    if trusted_proxies == 0:
+        app.logger.warning("Rate limiting by remote address: behind a proxy, set RATE_LIMIT_TRUSTED_PROXIES "
+                           "or all clients share the proxy bucket")
+    backend = app.config.get("RATE_LIMIT_BACKEND", "memory")
+    stores = {}
+
+    def get_store():
+        if "store" not in stores:
+            if backend == "mongo":
+                from services.db import mongo
+                stores["store"] = MongoBucketStore(mongo.db.rate_limits,
+                                                   app.config.get("RATE_LIMIT_BUCKET_TTL", 3600))
+            else:
+                stores["store"] = MemoryBucketStore(app.config.get("RATE_LIMIT_MAX_KEYS", 100000))
+        return stores["store"]
+
+    @app.before_request
+    def enforce_rate_limit():
+        if request.method == "OPTIONS" or request.blueprint in EXEMPT_BLUEPRINTS:
+            return None
+
+        klass = route_class()
+        capacity, refill_rate = limits[klass]
+        try:
+            allowed, retry_after = get_store().consume(f"{klass}:{client_key(trusted_proxies)}", capacity, refill_rate)
+        except PyMongoError as e:
+            # Fail open: an unreachable bucket store must not turn every request into a 500
+            metrics.incr("rate_limit.backend_error")
+            logger.warning("Rate limit backend unavailable, request allowed: %s", e)
+            return None
+        if allowed:
+            return None
+
+        metrics.incr("rate_limit.rejected")
+        metrics.incr(f"rate_limit.rejected.{klass}")
+        response = jsonify({"error": "Too many requests"})
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response, 429
@@ -0,0 +1,204 @@
+"""
+Related Films Index
+
+This module maintains the precomputed film-to-film similarity index served by
+`GET /films/<film_id>/related`. Two films are related when they share cast
+members; the co-cast count is weighted by genre and rating:
+
+    score(a, b) = shared_actors(a, b) * (GENRE_WEIGHT if same genre else 1) * (0.5 + rating(b) / 20)
+
+The co-cast counts are the sparse product of the film/actor incidence matrix with
+its transpose, computed through an inverted index (actor -> films) so that only
+pairs of films that actually share an actor are ever visited.
+
+Each film has one document in the `related_films` collection, keyed by the film
+`_id`, holding its `TOP_K` best matches with the small fields needed to render
+them. Serving related films is therefore a single `_id` read.
+
+The module only depends on pymongo so it can be used by the API and by the
+offline job (`python -m app.tools.related_index`).
+
+Functions:
+    - `rebuild_related(db)`: Recompute the whole index.
+    - `refresh_related(db, film_ids)`: Recompute the rows affected by changed films.
+    - `schedule_refresh(db, film_ids)`: Run `refresh_related` in the background.
+    - `get_related(db, film_id, limit)`: Read the related films of one film.
+"""
+
+import heapq
+import logging
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+TOP_K = 20
+GENRE_WEIGHT = 2.0
+WRITE_BATCH_SIZE = 1000
+
+SUMMARY_FIELDS = ["title", "genre", "rating", "release_year"]
+INDEX_PROJECTION = {field: 1 for field in ["actors"] + SUMMARY_FIELDS}
+
+logger = logging.getLogger(__name__)
+
+# A single worker applies refreshes in submission order.
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="related-refresh")
+_indexes_ready = False
+
+
+def ensure_indexes(db):
+    """
+    Create the indexes used to find the films and rows affected by a change.
+    """
+    global _indexes_ready
+    db.films.create_index("actors")
+    db.related_films.create_index("related._id")
+    _indexes_ready = True
+
+
+def _rating(film):
+    try:
+        return float(film.get("rating") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _score(film, other, shared_actors):
+    genre_weight = GENRE_WEIGHT if film.get("genre") and film.get("genre") == other.get("genre") else 1.0
+    return shared_actors * genre_weight * (0.5 + _rating(other) / 20)
+
+
+def _compute_rows(films_by_id, film_ids, top_k=TOP_K):
+    """
+    Compute the related rows of `film_ids`.
+
+    Args:
+        films_by_id (dict): Film id (str) -> film document. Must contain every film
+            sharing an actor with the films in `film_ids`.
+        film_ids (iterable): Ids of the rows to compute.
+
+    Returns:
+        dict: Film id -> list of related film summaries, best first.
+    """
+    films_by_actor = defaultdict(list)
+    for film_id, film in films_by_id.items():
+        for actor_id in set(film.get("actors") or []):
+            films_by_actor[actor_id].append(film_id)
+
+    rows = {}
+    for film_id in film_ids:
+        film = films_by_id.get(film_id)
+        if film is None:
+            continue
+
+        shared = Counter()
+        for actor_id in set(film.get("actors") or []):
+            shared.update(films_by_actor[actor_id])
+        shared.pop(film_id, None)
+
+        best = heapq.nlargest(top_k, (
+            (_score(film, films_by_id[other_id], count), other_id) for other_id, count in shared.items()
+        ))
+        rows[film_id] = [
+            dict({field: films_by_id[other_id].get(field) for field in SUMMARY_FIELDS},
+                 _id=other_id, score=round(score, 4))
+            for score, other_id in best
+        ]
+    return rows
+
+
+def _write_rows(db, rows, built_at):
+    operations = [
+        ReplaceOne({"_id": ObjectId(film_id)}, {"related": related, "built_at": built_at}, upsert=True)
+        for film_id, related in rows.items()
+    ]
+    for start in range(0, len(operations), WRITE_BATCH_SIZE):
+        db.related_films.bulk_write(operations[start:start + WRITE_BATCH_SIZE], ordered=False)
+
+
+def _load_films(db, query):
+    films = db.films.find(query, INDEX_PROJECTION)
+    return {str(film["_id"]): film for film in films}
+
+
+def rebuild_related(db, top_k=TOP_K):
+    """
+    Recompute the related films of every film and drop rows of deleted films.
+
+    Returns:
+        int: Number of rows written.
+    """
+    ensure_indexes(db)
+    built_at = time.time()
+    films_by_id = _load_films(db, {})
+    rows = _compute_rows(films_by_id, films_by_id.keys(), top_k)
+    _write_rows(db, rows, built_at)
+    db.related_films.delete_many({"built_at": {"$lt": built_at}})
+    return len(rows)
+
+
+def refresh_related(db, film_ids, top_k=TOP_K):
+    """
+    Recompute the rows affected by films that were added, updated or deleted.
+
+    Affected rows are the changed films themselves, the films sharing an actor
+    with them, and the films currently listing them as related (which covers
+    actors removed from a cast and deleted films).
+
+    Returns:
+        int: Number of rows written.
+    """
+    if not _indexes_ready:
+        ensure_indexes(db)
+    film_ids = [str(film_id) for film_id in film_ids]
+    object_ids = [ObjectId(film_id) for film_id in film_ids]
+    built_at = time.time()
+
+    changed = _load_films(db, {"_id": {"$in": object_ids}})
+    cast = {actor_id for film in changed.values() for actor_id in film.get("actors") or []}
+    affected = set(film_ids)
+    affected.update(_load_films(db, {"actors": {"$in": list(cast)}}).keys())
+    affected.update(str(row["_id"]) for row in db.related_films.find({"related._id": {"$in": film_ids}}, {"_id": 1}))
+
+    # Every film sharing an actor with an affected film is needed to score its row
+    affected_films = _load_films(db, {"_id": {"$in": [ObjectId(film_id) for film_id in affected]}})
+    neighbourhood_cast = {actor_id for film in affected_films.values() for actor_id in film.get("actors") or []}
+    films_by_id = _load_films(db, {"actors": {"$in": list(neighbourhood_cast)}})
+    films_by_id.update(affected_films)
+
+    rows = _compute_rows(films_by_id, affected, top_k)
+    _write_rows(db, rows, built_at)
+
+    deleted = [ObjectId(film_id) for film_id in film_ids if film_id not in changed]
+    if deleted:
+        db.related_films.delete_many({"_id": {"$in": deleted}})
+    return len(rows)
+
+
+def schedule_refresh(db, film_ids):
+    """
+    Refresh the rows affected by `film_ids` in a background thread.
+    """
+    film_ids = list(film_ids)
+    if not film_ids:
+        return
+
+    def refresh():
+        try:
+            refresh_related(db, film_ids)
+        except Exception:
+            logger.exception("Related films refresh failed for %s", film_ids)
+
+    _refresh_executor.submit(refresh)
+
+
+def get_related(db, film_id, limit=TOP_K):
+    """
+    Return the related films of `film_id`, or None if the film is not indexed.
+    """
+    row = db.related_films.find_one({"_id": ObjectId(film_id)}, {"related": {"$slice": limit}})
+    if row is None:
+        return None
+    return row["related"]
@@ -0,0 +1,267 @@
+"""
+Write-Behind Queue for Review Ingestion
+
+This module batches review writes when `REVIEW_WRITE_BEHIND` is enabled. Instead
+of one `insert_one` plus one `$push` on the film document per review, accepted
+reviews are queued in process memory and a background thread flushes them with
+one unordered `insert_many` and one update per film per batch. Under a spike on
+a single film this turns N contended updates of the same document into one.
+
+A batch is flushed when `REVIEW_BATCH_SIZE` reviews are queued or when the oldest
+queued review waited `REVIEW_FLUSH_INTERVAL` seconds.
+
+Durability:
+    - A review is acknowledged (`202 Accepted`) once it is queued, before it is
+      stored. Reviews still queued are lost if the process crashes or is killed
+      with SIGKILL. At most `REVIEW_QUEUE_SIZE` reviews are at risk per process.
+    - On normal shutdown (interpreter exit or SIGTERM) the queue is flushed.
+    - Review ids are generated when the review is accepted, so a failed batch can
+      be retried without duplicates: already inserted reviews are ignored and
+      film review lists are updated with `$addToSet`. When the database is
+      unreachable a batch is retried `REVIEW_FLUSH_RETRIES` times, then dropped
+      and logged.
+    - Any other error (e.g. a review that cannot be encoded or is rejected by
+      the server) makes the batch be written review by review, so only the
+      failing reviews are dropped and logged (`reviews.dropped`).
+    - Queued reviews are not visible to `GET /films/<id>/reviews` until flushed.
+      After each write the `on_flush` callback receives the ids of the films that
+      got new reviews, so that cached copies of those films can be dropped.
+
+Backpressure:
+    When the queue is full, `submit` returns False and the route answers `503`
+    with `Retry-After` instead of buffering without bound.
+
+Objects:
+    - `review_queue`: The shared `ReviewWriteQueue` of the process.
+
+Functions:
+    - `init_review_queue(app)`: Configure and start the queue when write-behind is
+      enabled, and register it as the `review_queue` app extension.
+"""
+
+import atexit
+import logging
+import queue
+import signal
+import sys
+import threading
+import time
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+from services.db import DUPLICATE_KEY_ERROR
+from services.film_store import add_review_ids
+from services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewWriteQueue:
+    """
+    Bounded in-process queue of reviews flushed in batches by a background thread.
+    """
+
+    def __init__(self, max_size=10000, batch_size=500, flush_interval=0.5, retries=3):
+        self.enabled = False
+        self._db = None
+        self._on_flush = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self.configure(max_size, batch_size, flush_interval, retries)
+
+    def configure(self, max_size, batch_size, flush_interval, retries):
+        """
+        Set the queue bounds and flush thresholds. Must be called before `start`.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self._queue = queue.Queue(maxsize=max_size)
+
+    def start(self, db, on_flush=None):
+        """
+        Start the background flusher writing to the database `db`.
+
+        `on_flush(film_ids)` is called after every write with the ids (str) of
+        the films whose review lists changed.
+        """
+        self._db = db
+        self._on_flush = on_flush
+        self.enabled = True
+        self._thread = threading.Thread(target=self._run, name="review-flusher", daemon=True)
+        self._thread.start()
+
+    def submit(self, review):
+        """
+        Queue a review document (with its `_id` already set).
+
+        Returns:
+            bool: False when the queue is full and the review was not accepted.
+        """
+        try:
+            self._queue.put_nowait(review)
+        except queue.Full:
+            metrics.incr("reviews.queue_rejected")
+            return False
+        metrics.set_gauge("reviews.queue_depth", self._queue.qsize())
+        return True
+
+    def stop(self):
+        """
+        Stop the flusher and write every queued review.
+        """
+        if not self.enabled:
+            return
+        self._stopping.set()
+        if self._thread is not None:
+            # Bounded: the flusher waits at most `flush_interval` and retries a failed batch `retries` times
+            self._thread.join()
+        while not self._queue.empty():
+            self.flush(self._drain(self.batch_size))
+        self.enabled = False
+
+    def _drain(self, limit, timeout=0):
+        """
+        Take up to `limit` reviews, waiting at most `timeout` seconds for the first one.
+        """
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < limit:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._drain(self.batch_size, timeout=self.flush_interval)
+            try:
+                self.flush(batch)
+            except Exception:
+                # The flusher must outlive any batch, or the queue only fills up from here on
+                logger.exception("Unexpected error flushing %d reviews", len(batch))
+                metrics.incr("reviews.dropped", len(batch))
+
+    def flush(self, batch):
+        """
+        Write a batch of reviews: one `insert_many` and one update per film.
+
+        A batch failing for another reason than a connection failure is written
+        review by review, dropping only the reviews that still fail.
+        """
+        if not batch:
+            return
+        with self._flush_lock:
+            try:
+                self._write_retrying(batch)
+                written = len(batch)
+            except ConnectionFailure:
+                logger.error("Dropping review batch after %d attempts: %s",
+                             self.retries, [str(review["_id"]) for review in batch])
+                metrics.incr("reviews.dropped", len(batch))
+                written = 0
+            except Exception as e:
+                logger.warning("Review batch of %d failed (%s), writing reviews one by one", len(batch), e)
+                metrics.incr("reviews.flush_failed")
+                written = sum(self._write_one(review) for review in batch)
+        if written:
+            metrics.incr("reviews.flushed", written)
+            metrics.incr("reviews.batches")
+        metrics.set_gauge("reviews.queue_depth", self._queue.qsize())
+
+    def _write_retrying(self, batch):
+        """
+        Write `batch`, retrying connection failures up to `retries` times.
+        """
+        attempts = max(self.retries, 1)
+        for attempt in range(1, attempts + 1):
+            try:
+                return self._write(batch)
+            except ConnectionFailure as e:
+                logger.warning("Review batch of %d failed (attempt %d): %s", len(batch), attempt, e)
+                metrics.incr("reviews.flush_failed")
+                if attempt == attempts:
+                    raise
+                time.sleep(min(0.1 * 2 ** attempt, 2))
+
+    def _write_one(self, review):
+        """
+        Write a single review. Returns 1 when written, 0 when dropped.
+        """
+        try:
+            self._write_retrying([review])
+            return 1
+        except Exception as e:
+            logger.error("Dropping review %s: %s", review.get("_id"), e)
+            metrics.incr("reviews.dropped")
+            return 0
+
+    def _write(self, batch):
+        try:
+            self._db.reviews.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != DUPLICATE_KEY_ERROR for error in e.details["writeErrors"]):
+                raise
+
+        review_ids_by_film = {}
+        for review in batch:
+            review_ids_by_film.setdefault(ObjectId(review["film_id"]), []).append(str(review["_id"]))
+        add_review_ids(self._db, review_ids_by_film, "$addToSet")
+        self._notify([str(film_id) for film_id in review_ids_by_film])
+
+    def _notify(self, film_ids):
+        if self._on_flush is None:
+            return
+        try:
+            self._on_flush(film_ids)
+        except Exception:
+            # The reviews are stored: a failing callback must not make them look lost
+            logger.exception("Review flush callback failed for films %s", film_ids)
+
+
+review_queue = ReviewWriteQueue()
+
+
+def init_review_queue(app, on_flush=None):
+    """
+    Configure and start the shared review queue if `REVIEW_WRITE_BEHIND` is set.
+
+    `on_flush(film_ids)` is called from the flusher thread after each write.
+
+    The queue is flushed at interpreter exit; SIGTERM is turned into a normal exit
+    so that `docker stop` flushes it too.
+    """
+    if not app.config.get("REVIEW_WRITE_BEHIND", False):
+        return
+
+    from services.db import mongo
+
+    review_queue.configure(
+        max_size=app.config.get("REVIEW_QUEUE_SIZE", 10000),
+        batch_size=app.config.get("REVIEW_BATCH_SIZE", 500),
+        flush_interval=app.config.get("REVIEW_FLUSH_INTERVAL", 0.5),
+        retries=app.config.get("REVIEW_FLUSH_RETRIES", 3)
+    )
+    review_queue.start(mongo.db, on_flush)
+    app.extensions["review_queue"] = review_queue
+    atexit.register(review_queue.stop)
+
+    try:
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        def exit_on_sigterm(signum, frame):
+            if callable(previous_handler):
+                previous_handler(signum, frame)
+            sys.exit(0)
+
+        signal.signal(signal.SIGTERM, exit_on_sigterm)
+    except ValueError:
+        # Not in the main thread (e.g. under a WSGI server): rely on atexit only
+        app.logger.info("SIGTERM handler not installed, review queue flushed at exit only")
@@ -0,0 +1,117 @@
+"""
+Startup Instrumentation and MongoDB Warm-Up
+
+This module measures how long each import and initialization phase of the
+service takes, and warms up the MongoDB connection pool in the background so
+the readiness probe only passes once the first requests will not pay for
+connection establishment.
+
+Objects:
+    - `startup`: The shared `StartupTimer` of the process.
+
+Functions:
+    - `start_mongo_warmup(app, client)`: Open pool connections in a background thread.
+
+Configuration (Flask `app.config`):
+    - `MONGO_WARMUP_CONNECTIONS` (int): Connections opened before the service is ready.
+    - `MONGO_WARMUP_TIMEOUT_MS` (int): `maxTimeMS` of the warm-up pings.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from services.metrics import metrics
+
+
+class StartupTimer:
+    """
+    Records the duration of named startup phases and the readiness state.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = {}
+        self.ready = threading.Event()
+        self.warmup_error = None
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as phase `name` and publish it as a gauge.
+        """
+        phase_started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - phase_started_at) * 1000)
+
+    def record(self, name, duration_ms):
+        self.phases[name] = round(duration_ms, 3)
+        metrics.set_gauge(f"startup.{name}_ms", self.phases[name])
+
+    def finish(self, app):
+        """
+        Record the total time since this timer was created and log every phase.
+        """
+        self.record("total", (time.perf_counter() - self.started_at) * 1000)
+        for name, duration_ms in self.phases.items():
+            app.logger.info("startup phase %s took %.1f ms", name, duration_ms)
+
+    def report(self):
+        """
+        Return the readiness state and the recorded phases.
+        """
+        return {"ready": self.ready.is_set(), "warmup_error": self.warmup_error, "phases": dict(self.phases)}
+
+
+startup = StartupTimer()
+
+
+def start_mongo_warmup(app, client):
+    """
+    Open `MONGO_WARMUP_CONNECTIONS` pool connections in a background thread.
+
+    The pings run concurrently so that each one checks out its own connection,
+    leaving that many established connections in the pool. `startup.ready` is
+    set once they all succeeded; on failure the warm-up is retried until the
+    database becomes reachable.
+    """
+    connections = app.config.get("MONGO_WARMUP_CONNECTIONS", 4)
+    timeout_ms = app.config.get("MONGO_WARMUP_TIMEOUT_MS", 5000)
+    admin = client.get_database("admin")
+
+    def ping(errors):
+        try:
+            admin.command("ping", maxTimeMS=timeout_ms)
+        except Exception as e:
+            errors.append(e)
+
+    def ping_concurrently():
+        # Daemon threads rather than an executor, so a pending warm-up never delays interpreter exit
+        errors = []
+        threads = [threading.Thread(target=ping, args=(errors,), daemon=True) for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def warm_up():
+        while True:
+            try:
+                with startup.phase("warmup.mongo"):
+                    ping_concurrently()
+            except Exception as e:
+                startup.warmup_error = str(e)
+                metrics.incr("startup.warmup_failed")
+                app.logger.warning("MongoDB warm-up failed, retrying: %s", e)
+                time.sleep(1)
+                continue
+            startup.warmup_error = None
+            startup.ready.set()
+            app.logger.info("MongoDB warm-up completed with %d connections", connections)
+            return
+
+    threading.Thread(target=warm_up, name="mongo-warmup", daemon=True).start()
@@ -0,0 +1,366 @@
+"""
+Distributed Tracing
+
+This module records OpenTelemetry-compatible spans for every HTTP request and
+every MongoDB command, so a slow request can be broken down into its database
+round trips and serialization steps.
+
+    - One `SERVER` span per request, continuing the caller's trace when a W3C
+      `traceparent` header is received. The `traceparent` of the request span is
+      returned in the response headers.
+    - One `CLIENT` child span per MongoDB command, created by `MongoTracingListener`
+      through pymongo command monitoring.
+    - `tracer.span(name)` for any other step (e.g. JSON serialization).
+
+Finished spans are serialized with the OTLP/JSON encoding (`traceId`, `spanId`,
+`startTimeUnixNano`, typed `AnyValue` attributes, ...) and handed to an exporter:
+
+    - `FileExporter`: Appends one OTLP `ExportTraceServiceRequest` per line
+      (`resourceSpans` > `scopeSpans` > `spans`) to a local file, the format read
+      by the OpenTelemetry Collector `otlpjsonfile` receiver.
+    - `InMemoryExporter`: Keeps the serialized spans in a list, for tests.
+
+Configuration (Flask `app.config`):
+    - `TRACING_ENABLED` (bool): Turn tracing on or off.
+    - `TRACING_EXPORTER` (str): `"file"` or `"memory"`.
+    - `TRACING_FILE` (str): Output path of the file exporter.
+    - `TRACING_SERVICE_NAME` (str): `service.name` resource attribute of the exported spans.
+    - `TRACING_SAMPLE_RATIO` (float): Fraction of new traces that are recorded.
+
+Objects:
+    - `tracer`: The shared `Tracer` instance.
+    - `mongo_listener`: The shared `MongoTracingListener`, passed to `init_db` as event listener.
+
+Functions:
+    - `init_tracing(app)`: Configure the exporter, register the request hooks and
+      register `tracer` as the `tracer` app extension.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from pymongo.monitoring import CommandListener
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+INVALID_TRACE_ID = "0" * 32
+INVALID_SPAN_ID = "0" * 16
+
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+SPAN_KIND_INTERNAL = 1
+
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+SCOPE_NAME = "content_service.tracing"
+
+_current_span = ContextVar("current_span", default=None)
+
+
+def any_value(value):
+    """
+    Encode a Python value as an OTLP/JSON `AnyValue`.
+    """
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # 64-bit integers are strings in the protobuf JSON mapping
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [any_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def key_values(attributes):
+    return [{"key": key, "value": any_value(value)} for key, value in attributes.items()]
+
+
+def export_request(spans, service_name):
+    """
+    Wrap serialized spans in an OTLP `ExportTraceServiceRequest`.
+    """
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": key_values({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": spans}]
+        }]
+    }
+
+
+class Span:
+    """
+    A timed operation belonging to a trace.
+    """
+
+    def __init__(self, name, trace_id, parent_span_id=None, kind=SPAN_KIND_INTERNAL, sampled=True, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_error(self, message):
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def traceparent(self):
+        """
+        Return the W3C `traceparent` header value identifying this span.
+        """
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self):
+        """
+        Serialize the span with the OTLP/JSON encoding.
+        """
+        status = {"code": self.status}
+        if self.status_message:
+            status["message"] = self.status_message
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": key_values(self.attributes),
+            "status": status
+        }
+
+
+class InMemoryExporter:
+    """
+    Collects finished spans in memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = []
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span.to_dict())
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+
+
+class FileExporter:
+    """
+    Appends finished spans to `path`, one `ExportTraceServiceRequest` per line.
+    """
+
+    def __init__(self, path, service_name="content_service"):
+        self._lock = threading.Lock()
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, span):
+        line = json.dumps(export_request([span.to_dict()], self.service_name)) + "\n"
+        with self._lock:
+            with open(self.path, "a") as handle:
+                handle.write(line)
+
+
+class Tracer:
+    """
+    Creates spans, tracks the current one and exports them when they end.
+    """
+
+    def __init__(self, exporter=None, sample_ratio=1.0):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def current_span(self):
+        return _current_span.get()
+
+    def start_span(self, name, kind=SPAN_KIND_INTERNAL, parent=None, attributes=None):
+        """
+        Create a span, child of `parent` (a `Span` or a `(trace_id, span_id, sampled)`
+        tuple) or of the current span when `parent` is None. Pass `parent=False` to
+        start a new trace. The span is not made current.
+        """
+        if parent is None:
+            parent = self.current_span()
+        if isinstance(parent, Span):
+            parent = (parent.trace_id, parent.span_id, parent.sampled)
+
+        if not parent:
+            trace_id = f"{random.getrandbits(128):032x}"
+            return Span(name, trace_id, None, kind, random.random() < self.sample_ratio, attributes)
+        trace_id, parent_span_id, sampled = parent
+        return Span(name, trace_id, parent_span_id, kind, sampled, attributes)
+
+    def end_span(self, span):
+        span.end_time = time.time_ns()
+        if span.sampled and self.exporter is not None:
+            self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        """
+        Run the enclosed block inside a new current span. Does nothing when tracing is off.
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        span = self.start_span(name, kind, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.set_error(str(e))
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+
+tracer = Tracer()
+
+
+def parse_traceparent(header):
+    """
+    Parse a W3C `traceparent` header.
+
+    Returns:
+        tuple: `(trace_id, parent_span_id, sampled)`, or None if the header is absent or invalid.
+    """
+    match = TRACEPARENT_RE.match((header or "").strip().lower())
+    if not match:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == INVALID_TRACE_ID or span_id == INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def inject(headers):
+    """
+    Add the `traceparent` of the current span to outgoing request `headers`.
+    """
+    span = tracer.current_span()
+    if span is not None:
+        headers["traceparent"] = span.traceparent()
+    return headers
+
+
+class MongoTracingListener(CommandListener):
+    """
+    Pymongo command listener creating a child span per MongoDB command.
+
+    Commands are started and finished on the thread that issued them, so the
+    span is parented to the span that is current when the command starts.
+    """
+
+    def __init__(self, tracer):
+        self._tracer = tracer
+        self._lock = threading.Lock()
+        self._spans = {}
+
+    def started(self, event):
+        if not self._tracer.enabled or self._tracer.current_span() is None:
+            return
+        target = event.command.get(event.command_name)
+        attributes = {
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.operation": event.command_name,
+            "net.peer.name": "%s:%s" % event.connection_id,
+        }
+        if isinstance(target, str):
+            attributes["db.mongodb.collection"] = target
+        span = self._tracer.start_span(f"mongodb.{event.command_name}", SPAN_KIND_CLIENT, attributes=attributes)
+        with self._lock:
+            self._spans[(event.request_id, event.connection_id)] = span
+
+    def _finish(self, event, error=None):
+        with self._lock:
+            span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is None:
+            return
+        if error:
+            span.set_error(error)
+        self._tracer.end_span(span)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure))
+
+
+mongo_listener = MongoTracingListener(tracer)
+
+
+def init_tracing(app):
+    """
+    Configure the shared tracer from `app.config` and trace every request.
+    """
+    if not app.config.get("TRACING_ENABLED", False):
+        return
+
+    if app.config.get("TRACING_EXPORTER", "file") == "memory":
+        tracer.exporter = InMemoryExporter()
+    else:
+        tracer.exporter = FileExporter(app.config.get("TRACING_FILE", "traces.ndjson"),
+                                       app.config.get("TRACING_SERVICE_NAME", "content_service"))
+    tracer.sample_ratio = app.config.get("TRACING_SAMPLE_RATIO", 1.0)
+    app.extensions["tracer"] = tracer
+
+    @app.before_request
+    def start_request_span():
+        span = tracer.start_span(
+            f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+            SPAN_KIND_SERVER,
+            parent=parse_traceparent(request.headers.get("traceparent")) or False,
+            attributes={"http.method": request.method, "http.target": request.path}
+        )
+        g.trace_span = span
+        g.trace_token = _current_span.set(span)
+
+    @app.after_request
+    def propagate_trace(response):
+        span = g.get("trace_span")
+        if span is not None:
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_error(f"HTTP {response.status_code}")
+            response.headers["traceparent"] = span.traceparent()
+            if "tracestate" in request.headers:
+                response.headers["tracestate"] = request.headers["tracestate"]
+        return response
+
+    @app.teardown_request
+    def end_request_span(exc):
+        span = g.pop("trace_span", None)
+        if span is None:
+            return
+        if exc is not None:
+            span.set_error(str(exc))
+        _current_span.reset(g.pop("trace_token"))
+        tracer.end_span(span)
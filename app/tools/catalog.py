@@ -0,0 +1,540 @@
+"""
+Catalog Import/Export Command Line Tool
+
+This module seeds or dumps the film and actor catalog from/to NDJSON or CSV files
+of arbitrary size without going through the HTTP API.
+
+Import pipeline:
+    1. The file is streamed and cut into chunks of `--chunk-size` records.
+    2. Chunks are parsed and validated by a process pool (`--workers`).
+    3. Actor references (surnames) of film chunks are resolved with one `$in` query
+       per chunk; actor chunks are deduplicated by surname the same way.
+    4. Chunks are written by a thread pool with unordered `insert_many` and
+       `bulk_write`, several chunks in flight at once. A chunk with a rejected
+       document (too large, failing validation) is written again document by
+       document, and the rejected records are reported like invalid ones.
+    5. After each chunk, in file order, a checkpoint file records how many records
+       are safely stored. Re-running the same command resumes from there.
+
+Every imported record gets an `_id` derived from the run seed and its position in
+the file, so a chunk that was partially written before an interruption is simply
+skipped as duplicate when resumed. Actor film lists are updated with `$addToSet`
+for the same reason.
+
+Usage:
+    python -m app.tools.catalog import films films.ndjson
+    python -m app.tools.catalog import actors actors.csv --workers 8
+    python -m app.tools.catalog export films films.csv
+
+Formats:
+    - NDJSON: one JSON object per line, same fields as the `POST /films` and `POST /actors` bodies.
+    - CSV: header row with the same fields; film `actors` are separated by `|`.
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bson import ObjectId
+from bson.errors import InvalidDocument
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.services.db import DEFAULT_URI, DUPLICATE_KEY_ERROR
+from app.services.film_store import LIST_PROJECTION, load_details, split_film
+
+FILM_FIELDS = ["title", "actors", "release_year", "genre", "rating", "description", "image_path", "trailer_path"]
+# Translation maps ({"<locale>": "<text>"}), NDJSON only
+FILM_OPTIONAL_FIELDS = ["titles", "descriptions"]
+ACTOR_FIELDS = ["name", "surname", "date_of_birth"]
+FIELDS = {"films": FILM_FIELDS, "actors": ACTOR_FIELDS}
+
+CSV_LIST_SEPARATOR = "|"
+
+
+# --------------------------------------------------------------------------- #
+# Parsing (runs in worker processes)
+# --------------------------------------------------------------------------- #
+
+def record_id(seed, offset):
+    """
+    Return the deterministic ObjectId of the record at `offset` for a run `seed`.
+    """
+    return ObjectId(hashlib.sha1(f"{seed}:{offset}".encode()).digest()[:12])
+
+
+def parse_film(record):
+    """
+    Validate a raw film record and convert it to the stored layout.
+
+    Raises:
+        ValueError: If a field is missing or has an invalid value.
+    """
+    missing = [field for field in FILM_FIELDS if record.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    actors = record["actors"]
+    if isinstance(actors, str):
+        actors = [surname.strip() for surname in actors.split(CSV_LIST_SEPARATOR) if surname.strip()]
+    if not isinstance(actors, list) or not all(isinstance(surname, str) for surname in actors):
+        raise ValueError("Field 'actors' must be a list of surnames")
+
+    film = {
+        "title": record["title"],
+        "actors": actors,
+        "release_year": int(record["release_year"]),
+        "genre": record["genre"],
+        "rating": float(record["rating"]),
+        "description": record["description"],
+        "image_path": record["image_path"],
+        "trailer_path": record["trailer_path"],
+        "reviews": []
+    }
+    for field in FILM_OPTIONAL_FIELDS:
+        if isinstance(record.get(field), dict):
+            film[field] = record[field]
+    return film
+
+
+def parse_actor(record):
+    """
+    Validate a raw actor record and convert it to the stored layout.
+
+    Raises:
+        ValueError: If a field is missing.
+    """
+    missing = [field for field in ACTOR_FIELDS if record.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    return {
+        "name": record["name"],
+        "surname": record["surname"],
+        "date_of_birth": record["date_of_birth"],
+        "films": []
+    }
+
+
+PARSERS = {"films": parse_film, "actors": parse_actor}
+
+
+def parse_chunk(collection, seed, start, raw_records):
+    """
+    Parse and validate one chunk of raw records.
+
+    Args:
+        collection (str): `"films"` or `"actors"`.
+        seed (str): Run seed used to derive record ids.
+        start (int): Offset of the first record of the chunk in the file.
+        raw_records (list): NDJSON lines (str) or CSV rows (dict).
+
+    Returns:
+        tuple: `(documents, errors)` where `errors` is a list of `(offset, message)`.
+    """
+    parser = PARSERS[collection]
+    documents, errors = [], []
+    for offset, raw in enumerate(raw_records, start):
+        try:
+            record = json.loads(raw) if isinstance(raw, str) else raw
+            if not isinstance(record, dict):
+                raise ValueError("Record must be an object")
+            document = parser(record)
+        except (ValueError, TypeError) as e:
+            errors.append((offset, str(e)))
+            continue
+        document["_id"] = record_id(seed, offset)
+        documents.append(document)
+    return documents, errors
+
+
+# --------------------------------------------------------------------------- #
+# File helpers
+# --------------------------------------------------------------------------- #
+
+def detect_format(path, file_format):
+    if file_format:
+        return file_format
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def iter_raw_records(handle, file_format):
+    """
+    Stream raw records from an open file without loading it in memory.
+    """
+    if file_format == "csv":
+        yield from csv.DictReader(handle)
+    else:
+        for line in handle:
+            if line.strip():
+                yield line
+
+
+def iter_chunks(records, chunk_size, skip):
+    """
+    Yield `(start_offset, records)` chunks, skipping the first `skip` records.
+    """
+    start = skip
+    records = itertools.islice(records, skip, None)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+class Checkpoint:
+    """
+    Resumable import state stored as JSON next to the imported file.
+    """
+
+    def __init__(self, path, source, collection):
+        self.path = path
+        self.state = {"source": source, "collection": collection, "seed": uuid.uuid4().hex, "offset": 0, "errors": 0}
+        if os.path.exists(path):
+            with open(path) as handle:
+                saved = json.load(handle)
+            if saved.get("source") == source and saved.get("collection") == collection:
+                self.state = saved
+
+    @property
+    def resumed(self):
+        return self.state["offset"] > 0
+
+    def advance(self, records, errors):
+        self.state["offset"] += records
+        self.state["errors"] += errors
+        self.save()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as handle:
+            json.dump(self.state, handle)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Progress:
+    """
+    Periodic records/sec reporting on stderr.
+    """
+
+    def __init__(self, label, interval=5.0):
+        self.label = label
+        self.interval = interval
+        self.records = 0
+        self.started_at = time.monotonic()
+        self.reported_at = self.started_at
+
+    def add(self, records):
+        self.records += records
+        now = time.monotonic()
+        if now - self.reported_at >= self.interval:
+            self.reported_at = now
+            self.report()
+
+    def report(self, final=False):
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        prefix = "done" if final else "progress"
+        print(f"[{prefix}] {self.label}: {self.records} records in {elapsed:.1f}s "
+              f"({self.records / elapsed:.0f} records/sec)", file=sys.stderr)
+
+
+# --------------------------------------------------------------------------- #
+# Writes (run in writer threads)
+# --------------------------------------------------------------------------- #
+
+def insert_ignoring_duplicates(collection, documents):
+    """
+    Unordered `insert_many` that treats already stored records as success.
+
+    Returns:
+        int: Number of newly inserted documents.
+    """
+    if not documents:
+        return 0
+    try:
+        return len(collection.insert_many(documents, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        fatal = [error for error in e.details["writeErrors"] if error["code"] != DUPLICATE_KEY_ERROR]
+        if fatal:
+            raise
+        return e.details["nInserted"]
+
+
+def write_films(db, films):
+    # Details first, as `film_store.insert_films` does, so a film is never visible without them
+    lights, details = zip(*(split_film(film) for film in films)) if films else ((), ())
+    insert_ignoring_duplicates(db.film_details, list(details))
+    inserted = insert_ignoring_duplicates(db.films, list(lights))
+
+    film_ids_by_actor = {}
+    for film in films:
+        for actor_id in film["actors"]:
+            film_ids_by_actor.setdefault(actor_id, []).append(str(film["_id"]))
+
+    if film_ids_by_actor:
+        db.actors.bulk_write([
+            UpdateOne({"_id": ObjectId(actor_id)}, {"$addToSet": {"films": {"$each": film_ids}}})
+            for actor_id, film_ids in film_ids_by_actor.items()
+        ], ordered=False)
+    return inserted
+
+
+def write_actors(db, actors):
+    return insert_ignoring_duplicates(db.actors, actors)
+
+
+WRITERS = {"films": write_films, "actors": write_actors}
+
+# Errors caused by the documents themselves (`DocumentTooLarge` is an `InvalidDocument`)
+DOCUMENT_ERRORS = (BulkWriteError, InvalidDocument)
+
+
+def write_error_message(error):
+    if isinstance(error, BulkWriteError) and error.details.get("writeErrors"):
+        return error.details["writeErrors"][0]["errmsg"]
+    return str(error)
+
+
+def write_chunk(writer, db, documents):
+    """
+    Write a chunk with `writer`. If documents of the chunk are rejected, write it
+    again document by document so that only the rejected ones are lost.
+
+    Returns:
+        tuple: `(inserted, errors)` where `errors` is a list of `(_id, message)`.
+    """
+    try:
+        return writer(db, documents), []
+    except DOCUMENT_ERRORS:
+        pass
+
+    errors = []
+    for document in documents:
+        try:
+            writer(db, [document])
+        except DOCUMENT_ERRORS as e:
+            errors.append((document["_id"], write_error_message(e)))
+    # Part of the chunk may have been stored by the first attempt, so count what is stored now
+    return len(documents) - len(errors), errors
+
+
+# --------------------------------------------------------------------------- #
+# Reference resolution (runs in the main thread, one query per chunk)
+# --------------------------------------------------------------------------- #
+
+class ActorResolver:
+    """
+    Batch resolution of actor surnames to ids, cached for the whole run.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.ids_by_surname = {}
+
+    def resolve(self, films):
+        unknown = {surname for film in films for surname in film["actors"]} - self.ids_by_surname.keys()
+        if unknown:
+            for actor in self.db.actors.find({"surname": {"$in": list(unknown)}}, {"surname": 1}):
+                self.ids_by_surname[actor["surname"]] = str(actor["_id"])
+        for film in films:
+            film["actors"] = [self.ids_by_surname[surname] for surname in film["actors"]
+                              if surname in self.ids_by_surname]
+        return films
+
+
+class ActorDeduplicator:
+    """
+    Drop actors whose surname already exists, as `POST /actors` does.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.seen = set()
+
+    def resolve(self, actors):
+        surnames = {actor["surname"] for actor in actors} - self.seen
+        existing = set()
+        if surnames:
+            existing = {actor["surname"] for actor in
+                        self.db.actors.find({"surname": {"$in": list(surnames)}}, {"surname": 1})}
+        fresh = []
+        for actor in actors:
+            if actor["surname"] in self.seen or actor["surname"] in existing:
+                continue
+            self.seen.add(actor["surname"])
+            fresh.append(actor)
+        return fresh
+
+
+RESOLVERS = {"films": ActorResolver, "actors": ActorDeduplicator}
+
+
+# --------------------------------------------------------------------------- #
+# Commands
+# --------------------------------------------------------------------------- #
+
+def import_catalog(db, collection, path, file_format=None, workers=None, chunk_size=1000, checkpoint_path=None):
+    """
+    Import a NDJSON/CSV file into `collection`, resuming from its checkpoint if any.
+
+    Returns:
+        dict: Summary with `records`, `inserted` and `errors` counts.
+    """
+    file_format = detect_format(path, file_format)
+    workers = workers or os.cpu_count() or 1
+    checkpoint = Checkpoint(checkpoint_path or path + ".checkpoint", os.path.abspath(path), collection)
+    if checkpoint.resumed:
+        print(f"Resuming {path} from record {checkpoint.state['offset']}", file=sys.stderr)
+    # Persist the seed before the first write so that an early interruption stays resumable
+    checkpoint.save()
+
+    seed = checkpoint.state["seed"]
+    resolver = RESOLVERS[collection](db)
+    writer = WRITERS[collection]
+    progress = Progress(f"import {collection}")
+    summary = {"records": 0, "inserted": 0, "errors": 0}
+
+    parsing = deque()
+    writing = deque()
+
+    def finish_oldest_write():
+        start, records, errors, future = writing.popleft()
+        inserted, write_errors = future.result()
+        if write_errors:
+            offsets = {record_id(seed, offset): offset for offset in range(start, start + records)}
+            for document_id, message in write_errors:
+                print(f"Record {offsets[document_id]}: {message}", file=sys.stderr)
+        summary["inserted"] += inserted
+        summary["errors"] += len(write_errors)
+        checkpoint.advance(records, errors + len(write_errors))
+        progress.add(records)
+
+    def dispatch_oldest_parse():
+        start, records, future = parsing.popleft()
+        documents, errors = future.result()
+        for offset, message in errors:
+            print(f"Record {offset}: {message}", file=sys.stderr)
+        summary["records"] += records
+        summary["errors"] += len(errors)
+        documents = resolver.resolve(documents) if documents else documents
+        writing.append((start, records, len(errors), write_pool.submit(write_chunk, writer, db, documents)))
+        if len(writing) > workers:
+            finish_oldest_write()
+
+    with open(path, newline="" if file_format == "csv" else None, encoding="utf-8") as handle, \
+            ProcessPoolExecutor(max_workers=workers) as parse_pool, \
+            ThreadPoolExecutor(max_workers=workers) as write_pool:
+        chunks = iter_chunks(iter_raw_records(handle, file_format), chunk_size, checkpoint.state["offset"])
+        for start, raw_records in chunks:
+            parsing.append((start, len(raw_records),
+                            parse_pool.submit(parse_chunk, collection, seed, start, raw_records)))
+            if len(parsing) > workers * 2:
+                dispatch_oldest_parse()
+        while parsing:
+            dispatch_oldest_parse()
+        while writing:
+            finish_oldest_write()
+
+    checkpoint.clear()
+    progress.report(final=True)
+    return summary
+
+
+def export_catalog(db, collection, path, file_format=None, chunk_size=1000):
+    """
+    Stream `collection` to a NDJSON/CSV file in the import format.
+
+    Film actor ids are translated back to surnames so that the export can be
+    imported again in another environment.
+
+    Returns:
+        int: Number of exported records.
+    """
+    file_format = detect_format(path, file_format)
+    fields = FIELDS[collection]
+    progress = Progress(f"export {collection}")
+    surnames_by_id = {}
+
+    projection = LIST_PROJECTION if collection == "films" else {field: 1 for field in fields}
+    cursor = db[collection].find({}, projection, batch_size=chunk_size)
+    with open(path, "w", newline="" if file_format == "csv" else None, encoding="utf-8") as handle:
+        csv_writer = None
+        if file_format == "csv":
+            csv_writer = csv.DictWriter(handle, fieldnames=fields, extrasaction="ignore")
+            csv_writer.writeheader()
+
+        while True:
+            batch = list(itertools.islice(cursor, chunk_size))
+            if not batch:
+                break
+
+            if collection == "films":
+                load_details(db, batch)
+                unknown = {actor_id for film in batch for actor_id in film.get("actors", [])} - surnames_by_id.keys()
+                object_ids = [ObjectId(actor_id) for actor_id in unknown if ObjectId.is_valid(actor_id)]
+                for actor in db.actors.find({"_id": {"$in": object_ids}}, {"surname": 1}):
+                    surnames_by_id[str(actor["_id"])] = actor["surname"]
+                for film in batch:
+                    film["actors"] = [surnames_by_id[actor_id] for actor_id in film.get("actors", [])
+                                      if actor_id in surnames_by_id]
+
+            for document in batch:
+                record = {field: document.get(field) for field in fields}
+                if collection == "films" and not csv_writer:
+                    record.update({field: document[field] for field in FILM_OPTIONAL_FIELDS if document.get(field)})
+                if csv_writer:
+                    if collection == "films":
+                        record["actors"] = CSV_LIST_SEPARATOR.join(record["actors"])
+                    csv_writer.writerow(record)
+                else:
+                    handle.write(json.dumps(record, default=str) + "\n")
+            progress.add(len(batch))
+
+    progress.report(final=True)
+    return progress.records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.tools.catalog", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uri", default=DEFAULT_URI, help="MongoDB URI including the database name")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command in ("import", "export"):
+        sub = subparsers.add_parser(command)
+        sub.add_argument("collection", choices=sorted(FIELDS))
+        sub.add_argument("path")
+        sub.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+        sub.add_argument("--chunk-size", type=int, default=1000)
+        if command == "import":
+            sub.add_argument("--workers", type=int, help="Parser processes and writer threads (default: CPU count)")
+            sub.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint)")
+
+    args = parser.parse_args(argv)
+    db = MongoClient(args.uri).get_default_database()
+
+    if args.command == "import":
+        summary = import_catalog(db, args.collection, args.path, args.format, args.workers,
+                                 args.chunk_size, args.checkpoint)
+        print(json.dumps(summary))
+        return 1 if summary["errors"] else 0
+
+    export_catalog(db, args.collection, args.path, args.format, args.chunk_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Film Layout Migration
+
+This module converts film documents written before schema version 2 to the
+split layout described in `app/services/film_store.py`, moving their heavy
+fields to `film_details`. Films are converted in batches of `--batch-size` with
+a pause between batches, so the migration can run against a live database. It
+can be interrupted and run again at any time.
+
+Usage:
+    python -m app.tools.migrate_films --batch-size 500 --pause 0.2
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from pymongo import MongoClient
+
+from app.services.db import DEFAULT_URI
+from app.services.film_store import migrate_batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.tools.migrate_films", description="Migrate films to schema version 2")
+    parser.add_argument("--uri", default=DEFAULT_URI, help="MongoDB URI including the database name")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.1, help="Seconds to sleep between batches")
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    args = parser.parse_args(argv)
+
+    db = MongoClient(args.uri).get_default_database()
+    started_at = time.monotonic()
+    batches = migrated = 0
+
+    while args.max_batches is None or batches < args.max_batches:
+        found, converted = migrate_batch(db, args.batch_size)
+        if not found:
+            break
+        batches += 1
+        migrated += converted
+        print(f"batch {batches}: {converted}/{found} films migrated", file=sys.stderr)
+        time.sleep(args.pause)
+
+    remaining = db.films.count_documents({"schema_version": {"$exists": False}})
+    print(json.dumps({"batches": batches, "migrated": migrated, "remaining": remaining,
+                      "seconds": round(time.monotonic() - started_at, 3)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Related Films Index Job
+
+This module rebuilds the `related_films` index served by
+`GET /films/<film_id>/related` (see `app/services/related.py`). The API keeps the
+index up to date when films are added, updated or deleted; the full rebuild is
+meant for the first deployment, after bulk imports and as a periodic job.
+
+Usage:
+    python -m app.tools.related_index rebuild
+    python -m app.tools.related_index refresh <film_id> [<film_id> ...]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from pymongo import MongoClient
+
+from app.services.db import DEFAULT_URI
+from app.services.related import rebuild_related, refresh_related, TOP_K
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.tools.related_index", description="Build the related films index")
+    parser.add_argument("--uri", default=DEFAULT_URI, help="MongoDB URI including the database name")
+    parser.add_argument("--top-k", type=int, default=TOP_K, help="Related films kept per film")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild")
+    refresh = subparsers.add_parser("refresh")
+    refresh.add_argument("film_ids", nargs="+")
+
+    args = parser.parse_args(argv)
+    db = MongoClient(args.uri).get_default_database()
+
+    started_at = time.monotonic()
+    if args.command == "rebuild":
+        rows = rebuild_related(db, args.top_k)
+    else:
+        rows = refresh_related(db, args.film_ids, args.top_k)
+    print(json.dumps({"rows": rows, "seconds": round(time.monotonic() - started_at, 3)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Startup Benchmark
+
+This module measures the cold start of the service: it creates the Flask app in
+fresh interpreters several times, collects the phases recorded by
+`services.startup` and the wall time of the whole process, and compares the
+median against a target. It exits with status 1 when the target is exceeded,
+so it can be tracked by the performance suite or a CI job.
+
+The MongoDB warm-up runs in the background and is not part of the measure: no
+database needs to be reachable.
+
+Usage:
+    python -m app.tools.startup_bench --runs 10 --target-ms 400
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed from APP_DIR, like `python app/app.py`, so `app` is the application module.
+PROBE = (
+    "import json\n"
+    "from app import create_app\n"
+    "from services.startup import startup\n"
+    "create_app()\n"
+    "print(json.dumps(startup.phases))\n"
+)
+
+
+def run_once():
+    """
+    Create the app in a new interpreter.
+
+    Returns:
+        dict: Phase durations in milliseconds, plus `process` for the whole interpreter run.
+    """
+    started_at = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=APP_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    process_ms = (time.perf_counter() - started_at) * 1000
+    phases = json.loads(output.strip().splitlines()[-1])
+    phases["process"] = round(process_ms, 3)
+    return phases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.tools.startup_bench", description="Measure service cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=500.0,
+                        help="Maximum median of the `total` phase (imports and create_app)")
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    medians = {name: round(statistics.median(run.get(name, 0.0) for run in runs), 3) for name in runs[0]}
+
+    for name, duration_ms in sorted(medians.items(), key=lambda item: -item[1]):
+        print(f"{name:<32} {duration_ms:>10.1f} ms")
+
+    passed = medians["total"] <= args.target_ms
+    print(json.dumps({"runs": args.runs, "target_ms": args.target_ms, "total_ms": medians["total"], "passed": passed}))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
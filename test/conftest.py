@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The service imports its modules as `services.*` (run from `app/`), the tools as `app.*`
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(1, os.path.join(ROOT_DIR, "app"))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """
+    An empty in-memory MongoDB database.
+    """
+    mongomock = pytest.importorskip("mongomock")
+    from mongomock.collection import BulkOperationBuilder
+
+    # Recent pymongo versions pass `sort` to bulk builders, which mongomock does not accept yet
+    for name in ("add_update", "add_replace"):
+        original = getattr(BulkOperationBuilder, name)
+
+        def without_sort(self, *args, _original=original, sort=None, **kwargs):
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(BulkOperationBuilder, name, without_sort)
+
+    return mongomock.MongoClient().contentdb
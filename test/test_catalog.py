@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from app.tools import catalog
+from app.tools.catalog import import_catalog, parse_chunk, record_id
+
+
+def actor_line(surname):
+    return json.dumps({"name": "Name", "surname": surname, "date_of_birth": "01-01-1970"})
+
+
+def film_line(**fields):
+    film = {"title": "Title", "actors": ["Rossi"], "release_year": "2001", "genre": "drama", "rating": "7.5",
+            "description": "Description", "image_path": "image.png", "trailer_path": "trailer.mp4"}
+    film.update(fields)
+    return json.dumps(film)
+
+
+def test_record_ids_are_deterministic_per_seed_and_offset():
+    assert record_id("seed", 3) == record_id("seed", 3)
+    assert record_id("seed", 3) != record_id("seed", 4)
+    assert record_id("seed", 3) != record_id("other", 3)
+
+
+def test_parse_chunk_reports_invalid_records_by_offset():
+    raw = [film_line(), film_line(actors=[{"surname": "Rossi"}]), "[]", film_line(rating="high"), "{"]
+
+    documents, errors = parse_chunk("films", "seed", 10, raw)
+
+    assert [document["_id"] for document in documents] == [record_id("seed", 10)]
+    assert documents[0]["rating"] == 7.5
+    assert [offset for offset, _ in errors] == [11, 12, 13, 14]
+
+
+def test_parse_chunk_splits_csv_actor_lists():
+    row = json.loads(film_line(actors="Rossi | Bianchi|"))
+
+    documents, errors = parse_chunk("films", "seed", 0, [row])
+
+    assert errors == []
+    assert documents[0]["actors"] == ["Rossi", "Bianchi"]
+
+
+@pytest.fixture
+def films_file(tmp_path):
+    path = tmp_path / "films.ndjson"
+    path.write_text("".join(film_line(title=f"Title{i}") + "\n" for i in range(10)))
+    return str(path)
+
+
+@pytest.fixture
+def actors_file(tmp_path):
+    path = tmp_path / "actors.ndjson"
+    path.write_text("".join(actor_line(f"Surname{i}") + "\n" for i in range(10)))
+    return str(path)
+
+
+def test_import_resumes_after_an_interruption_without_duplicates(db, films_file, monkeypatch):
+    write_films = catalog.WRITERS["films"]
+    calls = []
+
+    def crash_after_second_chunk(db, films):
+        calls.append(len(films))
+        inserted = write_films(db, films)
+        if len(calls) == 2:
+            # The chunk is stored but the checkpoint is not advanced
+            raise RuntimeError("interrupted")
+        return inserted
+
+    monkeypatch.setitem(catalog.WRITERS, "films", crash_after_second_chunk)
+    with pytest.raises(RuntimeError):
+        import_catalog(db, "films", films_file, workers=1, chunk_size=3)
+
+    with open(films_file + ".checkpoint") as handle:
+        assert json.load(handle)["offset"] == 3
+
+    monkeypatch.setitem(catalog.WRITERS, "films", write_films)
+    summary = import_catalog(db, "films", films_file, workers=1, chunk_size=3)
+
+    assert summary["records"] == 7
+    assert db.films.count_documents({}) == 10
+    assert db.film_details.count_documents({}) == 10
+    assert sorted(db.films.distinct("title")) == sorted(f"Title{i}" for i in range(10))
+
+
+def test_importing_actors_twice_skips_existing_surnames(db, actors_file):
+    import_catalog(db, "actors", actors_file, workers=1, chunk_size=4)
+    summary = import_catalog(db, "actors", actors_file, workers=1, chunk_size=4)
+
+    # The second run has a new seed, but actors are deduplicated by surname as `POST /actors` does
+    assert summary["inserted"] == 0
+    assert db.actors.count_documents({}) == 10
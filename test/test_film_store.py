@@ -0,0 +1,61 @@
+import pytest
+from bson import ObjectId
+
+from services.film_store import HEAVY_FIELDS, SCHEMA_VERSION, load_film, migrate_batch
+
+Collection = pytest.importorskip("mongomock.collection").Collection
+
+
+def legacy_film(**fields):
+    film = {"_id": ObjectId(), "title": "Title", "actors": [], "release_year": 2000, "genre": "drama",
+            "rating": 7.0, "description": "Description", "image_path": "image.png",
+            "trailer_path": "trailer.mp4", "reviews": ["r1"]}
+    film.update(fields)
+    return film
+
+
+def test_migrates_legacy_films_to_the_split_layout(db):
+    films = [legacy_film() for _ in range(3)]
+    db.films.insert_many(films)
+
+    assert migrate_batch(db, batch_size=2) == (2, 2)
+    assert migrate_batch(db, batch_size=2) == (1, 1)
+    assert migrate_batch(db, batch_size=2) == (0, 0)
+
+    for film in films:
+        light = db.films.find_one({"_id": film["_id"]})
+        assert light["schema_version"] == SCHEMA_VERSION
+        assert not any(field in light for field in HEAVY_FIELDS)
+        assert load_film(db, film["_id"])["description"] == "Description"
+
+
+def test_skips_a_film_modified_during_the_batch(db, monkeypatch):
+    film = legacy_film()
+    db.films.insert_one(film)
+    bulk_write = Collection.bulk_write
+
+    def modify_after_copy(self, operations, *args, **kwargs):
+        result = bulk_write(self, operations, *args, **kwargs)
+        if self.name == "film_details":
+            # A write lands between the copy of the details and the cleanup of `films`
+            db.films.update_one({"_id": film["_id"]}, {"$set": {"description": "Updated"}})
+        return result
+
+    monkeypatch.setattr(Collection, "bulk_write", modify_after_copy)
+    assert migrate_batch(db) == (1, 0)
+    assert db.films.find_one({"_id": film["_id"]})["description"] == "Updated"
+
+    monkeypatch.setattr(Collection, "bulk_write", bulk_write)
+    assert migrate_batch(db) == (1, 1)
+    assert load_film(db, film["_id"])["description"] == "Updated"
+
+
+def test_resuming_a_migration_keeps_reviews_added_meanwhile(db):
+    film = legacy_film()
+    db.films.insert_one(film)
+    # A previous interrupted run already copied the details, then a review was added to them
+    db.film_details.insert_one({"_id": film["_id"], "reviews": ["r1", "r2"]})
+
+    migrate_batch(db)
+
+    assert sorted(load_film(db, film["_id"])["reviews"]) == ["r1", "r2"]
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+from bson import ObjectId
+
+from services import locale_cache as locale_cache_module
+from services.locale_cache import LocaleCache
+
+mongomock = pytest.importorskip("mongomock")
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_invalidations_refresh_from_the_primary(monkeypatch):
+    monkeypatch.setattr(locale_cache_module, "REFRESH_DEBOUNCE", 0)
+    film_id = ObjectId()
+    # The secondary has not replicated the title update yet
+    secondary, primary = mongomock.MongoClient().secondary, mongomock.MongoClient().primary
+    for db, title in ((secondary, "Old"), (primary, "New")):
+        db.films.insert_one({"_id": film_id, "title": title, "rating": 5, "schema_version": 2})
+        db.film_details.insert_one({"_id": film_id, "description": "Description", "reviews": []})
+
+    cache = LocaleCache()
+    cache.start(secondary, ["en"], ttl=60, primary_db=primary)
+    wait_for(lambda: cache.get_top("en", 1) is not None)
+    assert cache.get_top("en", 1)[0]["title"] == "Old"
+
+    cache.invalidate(str(film_id))
+    wait_for(lambda: cache.get_top("en", 1) is not None)
+    assert cache.get_top("en", 1)[0]["title"] == "New"
+    assert cache.get_film("en", str(film_id))["title"] == "New"
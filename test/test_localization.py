@@ -0,0 +1,17 @@
+from bson import ObjectId
+
+from services.localization import film_response
+
+
+def test_film_response_localizes_and_hides_storage_fields():
+    film_id = ObjectId()
+    film = {"_id": film_id, "title": "The Title", "titles": {"it": "Il Titolo"}, "descriptions": {},
+            "description": "Description", "schema_version": 2}
+
+    assert film_response(film, "it") == {"_id": str(film_id), "title": "Il Titolo", "description": "Description"}
+
+
+def test_film_response_keeps_the_default_text_without_translation():
+    film = {"_id": ObjectId(), "title": "The Title", "titles": {"en": "The Title"}}
+
+    assert film_response(film, "it")["title"] == "The Title"
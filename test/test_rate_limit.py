@@ -0,0 +1,61 @@
+import pytest
+
+from services import rate_limit
+from services.rate_limit import MemoryBucketStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_allows_a_burst_up_to_capacity(clock):
+    store = MemoryBucketStore()
+
+    assert store.consume("client", 2, 1.0) == (True, 0)
+    assert store.consume("client", 2, 1.0) == (True, 0)
+    assert store.consume("client", 2, 1.0) == (False, pytest.approx(1.0))
+
+
+def test_refills_over_time_and_reports_retry_after(clock):
+    store = MemoryBucketStore()
+    store.consume("client", 1, 2.0)
+
+    clock[0] += 0.25
+    allowed, retry_after = store.consume("client", 1, 2.0)
+    assert not allowed
+    assert retry_after == pytest.approx(0.25)
+
+    clock[0] += 0.25
+    assert store.consume("client", 1, 2.0)[0]
+
+
+def test_refill_never_exceeds_capacity(clock):
+    store = MemoryBucketStore()
+    store.consume("client", 2, 1.0)
+
+    clock[0] += 3600
+    assert store.consume("client", 2, 1.0)[0]
+    assert store.consume("client", 2, 1.0)[0]
+    assert not store.consume("client", 2, 1.0)[0]
+
+
+def test_buckets_are_independent_per_key(clock):
+    store = MemoryBucketStore()
+    store.consume("one", 1, 1.0)
+
+    assert not store.consume("one", 1, 1.0)[0]
+    assert store.consume("two", 1, 1.0)[0]
+
+
+def test_least_recently_used_buckets_are_evicted(clock):
+    store = MemoryBucketStore(max_keys=2)
+    store.consume("one", 1, 0.0)
+    store.consume("two", 1, 0.0)
+    store.consume("three", 1, 0.0)
+
+    # "one" was evicted, so it starts again from a full bucket
+    assert store.consume("one", 1, 0.0)[0]
+    assert not store.consume("three", 1, 0.0)[0]
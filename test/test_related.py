@@ -0,0 +1,48 @@
+from services.related import GENRE_WEIGHT, _compute_rows
+
+
+def film(actors, genre="drama", rating=5, title=None):
+    return {"actors": actors, "genre": genre, "rating": rating, "title": title, "release_year": 2000}
+
+
+FILMS = {
+    "a": film(["1", "2"], "drama", 10),
+    "b": film(["1", "2"], "drama", 0),   # 2 shared actors, same genre
+    "c": film(["1"], "comedy", 10),      # 1 shared actor, other genre
+    "d": film(["3"], "drama", 10),       # no shared actor
+}
+
+
+def test_scores_shared_cast_weighted_by_genre_and_rating():
+    row = _compute_rows(FILMS, ["a"])["a"]
+
+    assert [related["_id"] for related in row] == ["b", "c"]
+    assert row[0]["score"] == 2 * GENRE_WEIGHT * 0.5
+    assert row[1]["score"] == 1 * 1.0 * 1.0
+
+
+def test_excludes_the_film_itself_and_unrelated_films():
+    rows = _compute_rows(FILMS, FILMS.keys())
+
+    assert all(related["_id"] != film_id for film_id, row in rows.items() for related in row)
+    assert rows["d"] == []
+
+
+def test_keeps_only_the_top_k_best_matches():
+    row = _compute_rows(FILMS, ["a"], top_k=1)["a"]
+
+    assert [related["_id"] for related in row] == ["b"]
+
+
+def test_rows_carry_the_summary_fields():
+    row = _compute_rows(FILMS, ["c"])["c"]
+
+    assert row[0]["_id"] == "a"
+    assert row[0]["genre"] == "drama"
+    assert row[0]["rating"] == 10
+
+
+def test_duplicated_actors_are_counted_once():
+    films = {"a": film(["1", "1"]), "b": film(["1"])}
+
+    assert _compute_rows(films, ["a"])["a"][0]["score"] == _compute_rows(films, ["b"])["b"][0]["score"]
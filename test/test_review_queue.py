@@ -0,0 +1,37 @@
+from bson import ObjectId
+
+from services.review_queue import ReviewWriteQueue
+
+
+def review(film_id):
+    return {"_id": ObjectId(), "film_id": str(film_id), "profile_id": "p", "nickname": "n", "text": "t"}
+
+
+def test_reports_the_films_of_each_flushed_batch(db):
+    films = [ObjectId(), ObjectId()]
+    db.films.insert_many([{"_id": film_id, "title": "Title"} for film_id in films])
+    flushed = []
+    review_queue = ReviewWriteQueue(flush_interval=0.01)
+    review_queue.start(db, on_flush=flushed.append)
+
+    for film_id in films + films[:1]:
+        assert review_queue.submit(review(film_id))
+    review_queue.stop()
+
+    assert set().union(*flushed) == set(map(str, films))
+    assert db.reviews.count_documents({}) == 3
+
+
+def test_a_failing_callback_does_not_drop_reviews(db):
+    film_id = ObjectId()
+    db.films.insert_one({"_id": film_id, "title": "Title"})
+
+    def fail(film_ids):
+        raise RuntimeError("cache down")
+
+    review_queue = ReviewWriteQueue(flush_interval=0.01)
+    review_queue.start(db, on_flush=fail)
+    review_queue.submit(review(film_id))
+    review_queue.stop()
+
+    assert db.reviews.count_documents({}) == 1
@@ -0,0 +1,30 @@
+import pytest
+
+from services.tracing import parse_traceparent
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SPAN_ID = "00f067aa0ba902b7"
+
+
+def test_parses_a_sampled_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{SPAN_ID}-01") == (TRACE_ID, SPAN_ID, True)
+
+
+def test_parses_an_unsampled_traceparent_ignoring_case_and_spaces():
+    assert parse_traceparent(f" 00-{TRACE_ID.upper()}-{SPAN_ID}-00 ") == (TRACE_ID, SPAN_ID, False)
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "",
+    "garbage",
+    f"01-{TRACE_ID}-{SPAN_ID}-01",           # unknown version
+    f"00-{TRACE_ID[:-1]}-{SPAN_ID}-01",       # short trace id
+    f"00-{TRACE_ID}-{SPAN_ID}0-01",           # long span id
+    f"00-{TRACE_ID}-{SPAN_ID}-1",             # short flags
+    f"00-{'0' * 32}-{SPAN_ID}-01",            # all-zero trace id
+    f"00-{TRACE_ID}-{'0' * 16}-01",           # all-zero span id
+    f"00-{TRACE_ID.replace('4', 'g')}-{SPAN_ID}-01",  # not hexadecimal
+])
+def test_rejects_invalid_traceparent(header):
+    assert parse_traceparent(header) is None